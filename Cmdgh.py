@@ -1,13 +1,19 @@
 import streamlit as st
 
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import json
-import hashlib
-import time
+from datetime import datetime
+import uuid
+
+from cart import Cart
+from admin import dashboard as admin_dashboard, reports as reports_page
+from auth import hash_password, login, logout, register
+from catalog import ALL_CATEGORIES, SORT_OPTIONS, get_catalog_index
+from database import (
+    DuplicateUserError, OutOfStockError, append_order, count_user_orders, count_users,
+    create_user, get_product, load_products, order_detail, user_order_page
+)
+from inventory import get_inventory
+from search import search_products
+from utils import flash, show_flash_messages
 
 # Set page configuration
 st.set_page_config(
@@ -68,55 +74,26 @@ if 'user_role' not in st.session_state:
 if 'user_id' not in st.session_state:
     st.session_state.user_id = None
 if 'cart' not in st.session_state:
-    st.session_state.cart = []
+    st.session_state.cart = Cart()
+if 'session_key' not in st.session_state:
+    st.session_state.session_key = uuid.uuid4().hex
 if 'page' not in st.session_state:
     st.session_state.page = "Home"
-if 'users' not in st.session_state:
-    st.session_state.users = []
-if 'orders' not in st.session_state:
-    st.session_state.orders = []
-
-# Sample product data
-def load_products():
-    products = [
-        {"id": 1, "name": "Wireless Headphones", "price": 100.00, "category": "Electronics", "stock": 50, "image": "🎧"},
-        {"id": 2, "name": "Smartphone", "price": 1500.00, "category": "Electronics", "stock": 30, "image": "📱"},
-        {"id": 3, "name": "Running Shoes", "price": 150.00, "category": "Fashion", "stock": 100, "image": "👟"},
-        {"id": 4, "name": "Shirts Unisex", "price": 49.00, "category": "Fashion", "stock": 40, "image": "👕"},
-        {"id": 5, "name": "Water Bottle", "price": 30.00, "category": "Home", "stock": 200, "image": "💧"},
-        {"id": 6, "name": "Ladies pouches", "price": 50.00, "category": "Fashion", "stock": 75, "image": "🎒"},
-        {"id": 7, "name": "Fitness Tracker", "price": 90.00, "category": "Electronics", "stock": 60, "image": "⌚"},
-        {"id": 8, "name": "Juice Extractor", "price": 470.00, "category": "Home", "stock": 45, "image": "🍹"}
-    ]
-    return products
-
-# User authentication functions
-def make_hashes(password):
-    return hashlib.sha256(str.encode(password)).hexdigest()
-
-def check_hashes(password, hashed_text):
-    if make_hashes(password) == hashed_text:
-        return hashed_text
-    return False
 
+# Default accounts, created once per database; cached so later reruns and
+# sessions of this process skip the check entirely
+@st.cache_resource(show_spinner=False)
 def initialize_users():
-    if not st.session_state.users:
-        # Add default admin user
-        st.session_state.users.append({
-            "username": "admin",
-            "password": make_hashes("admin123"),
-            "email": "admin@example.com",
-            "role": "admin",
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-        # Add default customer user
-        st.session_state.users.append({
-            "username": "customer",
-            "password": make_hashes("customer123"),
-            "email": "customer@example.com",
-            "role": "customer",
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
+    if count_users() == 0:
+        for username, password, email, role in [
+            ("admin", "admin123", "admin@example.com", "admin"),
+            ("customer", "customer123", "customer@example.com", "customer"),
+        ]:
+            try:
+                create_user(username, hash_password(password), email, role,
+                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            except DuplicateUserError:
+                pass  # another session seeded it first
 
 # Initialize users
 initialize_users()
@@ -128,52 +105,9 @@ def authentication_page():
     auth_option = st.radio("Select Option", ["Login", "Register"])
     
     if auth_option == "Login":
-        login_form()
+        login()
     else:
-        register_form()
-
-def login_form():
-    with st.form("Login"):
-        username = st.text_input("Username")
-        password = st.text_input("Password", type="password")
-        submit = st.form_submit_button("Login")
-        
-        if submit:
-            user = next((u for u in st.session_state.users if u["username"] == username), None)
-            if user and check_hashes(password, user["password"]):
-                st.session_state.logged_in = True
-                st.session_state.user_role = user["role"]
-                st.session_state.user_id = username
-                st.success(f"Logged in successfully as {username}!")
-                time.sleep(1)
-                st.rerun()
-            else:
-                st.error("Invalid username or password")
-
-def register_form():
-    with st.form("Register"):
-        username = st.text_input("Username")
-        email = st.text_input("Email")
-        password = st.text_input("Password", type="password")
-        confirm_password = st.text_input("Confirm Password", type="password")
-        submit = st.form_submit_button("Register")
-        
-        if submit:
-            if password != confirm_password:
-                st.error("Passwords do not match")
-            elif any(u["username"] == username for u in st.session_state.users):
-                st.error("Username already exists")
-            else:
-                st.session_state.users.append({
-                    "username": username,
-                    "password": make_hashes(password),
-                    "email": email,
-                    "role": "customer",
-                    "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
-                st.success("Registration successful! Please login.")
-                time.sleep(1)
-                st.rerun()
+        register()
 
 # Navigation
 def navigation():
@@ -188,10 +122,11 @@ def navigation():
         selected = st.radio("Navigation", menu_options)
         
         if selected == "Logout":
-            st.session_state.logged_in = False
-            st.session_state.user_role = None
-            st.session_state.user_id = None
-            st.session_state.cart = []
+            logout()
+            get_inventory().release_all(st.session_state.session_key,
+                                        st.session_state.cart.quantities())
+            st.session_state.cart.clear()
+            st.session_state.checking_out = False
             st.rerun()
         else:
             st.session_state.page = selected
@@ -235,41 +170,54 @@ def home_page():
             st.markdown(f"### {product['image']} {product['name']}")
             st.markdown(f"**${product['price']}**")
             if st.button("Add to Cart", key=f"home_{product['id']}"):
-                add_to_cart(product)
-                st.success(f"Added {product['name']} to cart!")
+                if add_to_cart(product):
+                    st.success(f"Added {product['name']} to cart!")
+                else:
+                    st.error(f"Sorry, {product['name']} is out of stock.")
 
 # Products page
 def products_page():
     st.title("Products")
     
-    products = load_products()
+    catalog = get_catalog_index()
+    
+    query = st.text_input("Search products", placeholder="Name or category, e.g. 'wireles head'")
     
     # Filter options
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
-        categories = ["All"] + list(set([p["category"] for p in products]))
+        categories = [ALL_CATEGORIES] + catalog.categories
         selected_category = st.selectbox("Filter by Category", categories)
     
     with col2:
-        sort_option = st.selectbox("Sort by", ["Price: Low to High", "Price: High to Low", "Name"])
+        sort_option = st.selectbox("Sort by", list(SORT_OPTIONS))
     
-    # Apply filters
-    if selected_category != "All":
-        filtered_products = [p for p in products if p["category"] == selected_category]
-    else:
-        filtered_products = products
+    with col3:
+        if catalog.min_price < catalog.max_price:
+            min_price, max_price = st.slider(
+                "Price range",
+                min_value=float(catalog.min_price),
+                max_value=float(catalog.max_price),
+                value=(float(catalog.min_price), float(catalog.max_price))
+            )
+            if (min_price, max_price) == (float(catalog.min_price), float(catalog.max_price)):
+                min_price, max_price = None, None    # full range: no filter to apply
+        else:
+            min_price, max_price = None, None
     
-    # Apply sorting
-    if sort_option == "Price: Low to High":
-        filtered_products.sort(key=lambda x: x["price"])
-    elif sort_option == "Price: High to Low":
-        filtered_products.sort(key=lambda x: x["price"], reverse=True)
-    elif sort_option == "Name":
-        filtered_products.sort(key=lambda x: x["name"])
+    # Only the requested page is fetched from the sorted index
+    page_number = st.session_state.get("products_page_number", 1)
+    if query.strip():
+        # Ranked by relevance; the category and price filters still apply
+        result = search_products(query, selected_category, min_price, max_price, page_number)
+        if not result.total:
+            st.info(f"No products match '{query}'.")
+    else:
+        result = catalog.query(selected_category, SORT_OPTIONS[sort_option], min_price, max_price, page_number)
     
     # Display products
     cols = st.columns(4)
-    for idx, product in enumerate(filtered_products):
+    for idx, product in enumerate(result.items):
         col_idx = idx % 4
         with cols[col_idx]:
             st.markdown(f"### {product['image']} {product['name']}")
@@ -278,54 +226,92 @@ def products_page():
             st.markdown(f"**Stock:** {product['stock']}")
             
             if st.button("Add to Cart", key=f"prod_{product['id']}"):
-                add_to_cart(product)
-                st.success(f"Added {product['name']} to cart!")
+                if add_to_cart(product):
+                    st.success(f"Added {product['name']} to cart!")
+                else:
+                    st.error(f"Sorry, {product['name']} is out of stock.")
+    
+    if result.pages > 1:
+        # Keep the widget in range when a filter change shrinks the result set
+        st.session_state.products_page_number = result.page
+        st.number_input(
+            f"Page (of {result.pages}, {result.total} products)",
+            min_value=1,
+            max_value=result.pages,
+            key="products_page_number"
+        )
 
 # Cart functions
 def add_to_cart(product):
-    for item in st.session_state.cart:
-        if item["id"] == product["id"]:
-            item["quantity"] += 1
-            return
-    
-    product_copy = product.copy()
-    product_copy["quantity"] = 1
-    st.session_state.cart.append(product_copy)
+    # Hold a unit for this session so concurrent shoppers cannot oversell it
+    if not get_inventory().reserve(st.session_state.session_key, product["id"]):
+        return False
+    st.session_state.cart.add(product)
+    return True
 
 def remove_from_cart(product_id):
-    st.session_state.cart = [item for item in st.session_state.cart if item["id"] != product_id]
+    get_inventory().release(st.session_state.session_key, product_id)
+    st.session_state.cart.remove(product_id)
+
+def update_cart(quantities):
+    """Apply all quantity edits from one form submit; returns names that could not be reserved."""
+    cart = st.session_state.cart
+    inventory = get_inventory()
+    accepted, rejected = {}, []
+    for product_id, quantity in quantities.items():
+        if quantity == cart.quantity(product_id):
+            continue
+        if quantity == 0:
+            inventory.release(st.session_state.session_key, product_id)
+        elif not inventory.set_reservation(st.session_state.session_key, product_id, quantity):
+            rejected.append(next(item["name"] for item in cart if item["id"] == product_id))
+            continue
+        accepted[product_id] = quantity
+    cart.apply_quantities(accepted)
+    return rejected
 
 def cart_page():
     st.title("Shopping Cart")
     
-    if not st.session_state.cart:
+    cart = st.session_state.cart
+    if not cart:
         st.info("Your cart is empty.")
         return
     
-    total = 0
-    for item in st.session_state.cart:
-        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-        with col1:
-            st.markdown(f"**{item['image']} {item['name']}**")
-        with col2:
-            st.markdown(f"${item['price']}")
-        with col3:
-            st.markdown(f"Qty: {item['quantity']}")
-        with col4:
-            item_total = item['price'] * item['quantity']
-            st.markdown(f"${item_total}")
-            if st.button("Remove", key=f"remove_{item['id']}"):
-                remove_from_cart(item['id'])
+    # One form for every line, so a batch of edits costs a single rerun
+    with st.form("cart_form"):
+        quantities = {}
+        for item in cart:
+            col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+            with col1:
+                st.markdown(f"**{item['image']} {item['name']}**")
+            with col2:
+                st.markdown(f"${item['price']}")
+            with col3:
+                quantities[item['id']] = st.number_input(
+                    "Qty", min_value=0, value=item['quantity'], step=1,
+                    key=f"qty_{item['id']}", label_visibility="collapsed"
+                )
+            with col4:
+                st.markdown(f"${item['price'] * item['quantity']:,.2f}")
+        
+        st.caption("Set a quantity to 0 to remove the item.")
+        if st.form_submit_button("Update Cart"):
+            rejected = update_cart(quantities)
+            for name in rejected:
+                st.error(f"Sorry, there is not enough stock for more {name}.")
+            if not rejected:
                 st.rerun()
-        total += item_total
     
-    st.markdown(f"### Total: ${total}")
+    st.markdown(f"### Total: ${cart.subtotal:,.2f}")
     
+    # Remember the choice so the checkout form survives its own submit rerun
     if st.button("Proceed to Checkout"):
+        st.session_state.checking_out = True
+    if st.session_state.get("checking_out"):
         checkout()
 
 def checkout():
-    def checkout():
     if not st.session_state.cart:
         st.error("Your cart is empty!")
         return
@@ -352,166 +338,90 @@ def checkout():
             provider = st.selectbox("Network Provider", ["MTN", "Vodafone", "AirtelTigo"])
 
         if st.form_submit_button("Complete Purchase"):
+            cart = st.session_state.cart
+            
+            # Snapshot prices against the live catalog before charging
+            changes = cart.reprice(get_product)
+            if changes:
+                for line, new_price in changes:
+                    if new_price is None:
+                        st.warning(f"{line['name']} is no longer available and was removed from your cart.")
+                    else:
+                        st.warning(f"The price of {line['name']} changed from ${line['price']} to ${new_price}.")
+                st.info("Please review your cart and complete the purchase again.")
+                return
+            
+            # Take the stock first; every line succeeds or none does
+            lines = cart.quantities()
+            try:
+                get_inventory().purchase(st.session_state.session_key, lines)
+            except OutOfStockError as exc:
+                item = next(i for i in cart if i['id'] == exc.product_id)
+                st.error(f"Sorry, there is not enough stock left for {item['name']}.")
+                return
+            
             # Process order
-            order_id = len(st.session_state.orders) + 1
-            order = {
-                "order_id": order_id,
-                "user_id": st.session_state.user_id,
-                "items": st.session_state.cart.copy(),
-                "total": sum(item['price'] * item['quantity'] for item in st.session_state.cart),
-                "shipping_info": {
-                    "name": name,
-                    "address": address,
-                    "city": city,
-                    "state": state,
-                    "zip_code": zip_code
-                },
-                "payment_method": payment_method,
-                "order_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "status": "Processing"
-            }
-
-            st.session_state.orders.append(order)
-            st.session_state.cart = []
-
-            st.success(f"✅ Order placed successfully! Your order ID is #{order_id}")
-            time.sleep(2)
+            order = cart.to_order(
+                st.session_state.user_id,
+                {"name": name, "address": address, "city": city, "state": state, "zip_code": zip_code},
+                payment_method,
+            )
+
+            try:
+                order_id = append_order(order.as_dict())
+            except Exception:
+                get_inventory().restock(lines)
+                raise
+            cart.clear()
+            st.session_state.checking_out = False
+
+            flash(f"✅ Order placed successfully! Your order ID is #{order_id}")
             st.rerun()
 
 
 # Orders page for customers
 def orders_page():
     st.title("My Orders")
-    
-    user_orders = [order for order in st.session_state.orders if order["user_id"] == st.session_state.user_id]
-    
+    user_id = st.session_state.user_id
+
+    # Cursors of the pages visited so far; the last one is the page on screen
+    cursors = st.session_state.setdefault("orders_cursors", [None])
+    user_orders, older = user_order_page(user_id, before=cursors[-1])
+
     if not user_orders:
+        if len(cursors) > 1:
+            cursors.pop()
+            st.rerun()
         st.info("You haven't placed any orders yet.")
         return
-    
+
+    st.caption(f"{count_user_orders(user_id)} orders, newest first")
     for order in user_orders:
-        with st.expander(f"Order #{order['order_id']} - {order['order_date']} - Total: ${order['total']} - Status: {order['status']}"):
+        st.write(f"**Order #{order['order_id']}** - {order['order_date']} - Total: ${order['total']} - Status: {order['status']}")
+        # Items and shipping are only fetched for the orders opened
+        if st.toggle("Show details", key=f"order_details_{order['order_id']}"):
+            detail = order_detail(order["order_id"], user_id)
             st.write("**Items:**")
-            for item in order["items"]:
+            for item in detail["items"]:
                 st.write(f"{item['name']} - ${item['price']} x {item['quantity']} = ${item['price'] * item['quantity']}")
-            
-            st.write("**Shipping Address:**")
-            st.write(f"{order['shipping_info']['name']}")
-            st.write(f"{order['shipping_info']['address']}")
-            st.write(f"{order['shipping_info']['city']}, {order['shipping_info']['state']} {order['shipping_info']['zip_code']}")
-
-# Admin dashboard
-def admin_dashboard():
-    st.title("Admin Dashboard")
-    
-    # Key metrics
-    total_orders = len(st.session_state.orders)
-    total_revenue = sum(order["total"] for order in st.session_state.orders)
-    total_users = len(st.session_state.users)
-    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-    
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Orders", total_orders)
-    col2.metric("Total Revenue", f"${total_revenue:,.2f}")
-    col3.metric("Total Users", total_users)
-    col4.metric("Average Order Value", f"${avg_order_value:,.2f}")
-    
-    # Order trend chart
-    st.subheader("Order Trends")
-    if st.session_state.orders:
-        orders_df = pd.DataFrame(st.session_state.orders)
-        orders_df['order_date'] = pd.to_datetime(orders_df['order_date'])
-        orders_by_date = orders_df.groupby(orders_df['order_date'].dt.date).size().reset_index(name='count')
-        
-        fig = px.line(orders_by_date, x='order_date', y='count', title='Orders Over Time')
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("No orders data available for visualization.")
-    
-    # Recent orders
-    st.subheader("Recent Orders")
-    if st.session_state.orders:
-        recent_orders = st.session_state.orders[-5:]  # Last 5 orders
-        for order in reversed(recent_orders):
-            st.write(f"**Order #{order['order_id']}** - {order['order_date']} - ${order['total']} - {order['status']}")
-    else:
-        st.info("No recent orders.")
-    
-    # User management
-    st.subheader("User Management")
-    users_df = pd.DataFrame(st.session_state.users)
-    users_df = users_df[['username', 'email', 'role', 'created_at']]
-    st.dataframe(users_df, use_container_width=True)
-
-# Reports page
-def reports_page():
-    st.title("Reports")
-    
-    # Sales report
-    st.subheader("Sales Report")
-    if st.session_state.orders:
-        orders_df = pd.DataFrame(st.session_state.orders)
-        
-        # Expand items
-        items_list = []
-        for order in st.session_state.orders:
-            for item in order["items"]:
-                item_copy = item.copy()
-                item_copy["order_id"] = order["order_id"]
-                item_copy["order_date"] = order["order_date"]
-                items_list.append(item_copy)
-        
-        items_df = pd.DataFrame(items_list)
-        
-        # Sales by product
-        product_sales = items_df.groupby('name').agg({
-            'quantity': 'sum',
-            'price': 'mean',
-            'id': 'count'
-        }).rename(columns={'id': 'orders_count'})
-        
-        product_sales['revenue'] = product_sales['quantity'] * product_sales['price']
-        product_sales = product_sales.sort_values('revenue', ascending=False)
-        
-        st.write("**Top Selling Products by Revenue**")
-        st.dataframe(product_sales, use_container_width=True)
-        
-        # Sales by category
-        products_df = pd.DataFrame(load_products())
-        items_with_cat = items_df.merge(products_df[['id', 'category']], left_on='id', right_on='id')
-        category_sales = items_with_cat.groupby('category').agg({
-            'quantity': 'sum',
-            'price': 'mean'
-        })
-        category_sales['revenue'] = category_sales['quantity'] * category_sales['price']
-        category_sales = category_sales.sort_values('revenue', ascending=False)
-        
-        st.write("**Sales by Category**")
-        fig = px.pie(category_sales, values='revenue', names=category_sales.index, title='Revenue by Category')
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Export options
-        st.download_button(
-            label="Download Sales Report (CSV)",
-            data=product_sales.to_csv(),
-            file_name="sales_report.csv",
-            mime="text/csv"
-        )
-    else:
-        st.info("No sales data available for reporting.")
-    
-    # Inventory report
-    st.subheader("Inventory Report")
-    products_df = pd.DataFrame(load_products())
-    st.dataframe(products_df[['name', 'category', 'price', 'stock']], use_container_width=True)
-    
-    low_stock = products_df[products_df['stock'] < 10]
-    if not low_stock.empty:
-        st.warning("**Low Stock Alert**")
-        st.dataframe(low_stock[['name', 'category', 'stock']], use_container_width=True)
+
+            shipping = detail["shipping_info"]
+            if shipping:
+                st.write("**Shipping Address:**")
+                st.write(f"{shipping.get('name', '')}")
+                st.write(f"{shipping.get('address', '')}")
+                st.write(f"{shipping.get('city', '')}, {shipping.get('state', '')} {shipping.get('zip_code', '')}")
+        st.divider()
+
+    # Cursors move in button callbacks, so the new page is the one this rerun renders
+    col1, col2 = st.columns(2)
+    col1.button("← Newer orders", disabled=len(cursors) == 1, on_click=cursors.pop)
+    col2.button("Older orders →", disabled=older is None, on_click=cursors.append, args=(older,))
 
 # Main app logic
 def main():
+    show_flash_messages()
+    
     if not st.session_state.logged_in:
         authentication_page()
     else:
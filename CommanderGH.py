@@ -1,12 +1,115 @@
 import streamlit as st
-from auth import login, register
-from database import load_products, save_order
-from utils import calculate_cart_total
+from auth import login, logout, register
+from cart import Cart
+from catalog import get_catalog_index
+from database import DatabaseError, OutOfStockError, save_order
+from search import search_products
+from utils import calculate_cart_total, flash, show_flash_messages
 
 st.set_page_config(page_title="CommanderGh Imports", layout="wide")
 
+if "order_cart" not in st.session_state:
+    st.session_state.order_cart = Cart()
+    st.session_state.order_revision = 0   # bumped on every cart change to reset the qty widgets
+
+
+def cart_changed():
+    st.session_state.order_revision += 1
+
+
+def quick_add(catalog):
+    # Add by SKU (the product id) without paging through the catalog
+    with st.form("quick_add", clear_on_submit=True):
+        col1, col2, col3 = st.columns([2, 1, 1])
+        sku = col1.text_input("SKU")
+        qty = col2.number_input("Qty", min_value=1, value=1, step=1)
+        submitted = col3.form_submit_button("Quick add")
+    if not submitted:
+        return
+    sku_digits = sku.strip()
+    # isdigit() alone accepts "²" and "١", which int() rejects
+    product = catalog.by_id.get(int(sku_digits)) if sku_digits.isascii() and sku_digits.isdecimal() else None
+    cart = st.session_state.order_cart
+    if product is None:
+        st.error(f"No product with SKU {sku!r}.")
+    elif cart.quantity(product['id']) + qty > product['stock']:
+        st.error(f"Only {product['stock']} of {product['name']} in stock.")
+    else:
+        cart.add(product, qty)
+        cart_changed()
+        st.rerun()
+
+
+def order_page(user):
+    catalog = get_catalog_index()
+    cart = st.session_state.order_cart
+
+    st.subheader("Products")
+    quick_add(catalog)
+    search = st.text_input("Search products", key="order_search")
+    page_number = st.session_state.get("order_page_number", 1)
+    if search.strip():
+        result = search_products(search, page=page_number)
+    else:
+        result = catalog.query(sort="name", page=page_number)
+
+    # Only the current page gets widgets, so a rerun costs O(page), not O(catalog)
+    revision = st.session_state.order_revision
+    with st.form("order_form"):
+        quantities = {}
+        for p in result.items:
+            col1, col2 = st.columns([3, 1])
+            col1.write(f"SKU {p['id']} · {p['name']} - ${p['price']} - Stock: {p['stock']}")
+            quantities[p['id']] = col2.number_input(
+                f"Qty for {p['name']}", min_value=0, max_value=max(p['stock'], cart.quantity(p['id'])),
+                value=cart.quantity(p['id']), key=f"qty_{p['id']}_{revision}", label_visibility="collapsed")
+        submitted = st.form_submit_button("Update order")
+    if submitted:
+        for product_id, qty in quantities.items():
+            if qty != cart.quantity(product_id):
+                if product_id in cart:
+                    cart.set_quantity(product_id, qty)
+                else:
+                    cart.add(catalog.by_id[product_id], qty)
+        cart_changed()
+        st.rerun()
+
+    if result.pages > 1:
+        # Keep the widget in range when a new search shrinks the result set
+        st.session_state.order_page_number = result.page
+        st.number_input(f"Page (of {result.pages}, {result.total} products)",
+                        min_value=1, max_value=result.pages, key="order_page_number")
+
+    if cart:
+        items = [{"product": line, "quantity": line['quantity']} for line in cart]
+        st.subheader("Cart")
+        for item in items:
+            st.write(f"{item['quantity']} x {item['product']['name']} = ${item['quantity']*item['product']['price']}")
+        total = calculate_cart_total(items)
+        st.write(f"**Total: ${total}**")
+        if st.button("Checkout"):
+            try:
+                order_id = save_order(user['username'], items, total)
+            except OutOfStockError as exc:
+                st.error(f"Sorry, there is not enough stock left for {catalog.by_id[exc.product_id]['name']}.")
+            except DatabaseError as exc:
+                st.error(f"Your order could not be placed: {exc}")
+            else:
+                cart.clear()
+                cart_changed()
+                flash(f"Order #{order_id} placed successfully!")
+                st.rerun()
+
+
 menu = ["Home", "Login", "Register", "Admin"]
 choice = st.sidebar.selectbox("Menu", menu)
+if st.session_state.get("logged_in") and st.sidebar.button("Logout"):
+    logout()
+    st.session_state.order_cart.clear()
+    cart_changed()
+    st.rerun()
+
+show_flash_messages()
 
 if choice == "Home":
     st.title("Welcome to the CommanderGh Imports")
@@ -19,26 +122,7 @@ elif choice == "Login":
     user = login()
     if user:
         st.success(f"Logged in as {user['username']}!")
-        
-        products = load_products()
-        cart = []
-        
-        st.subheader("Products")
-        for p in products:
-            st.write(f"{p['name']} - ${p['price']} - Stock: {p['stock']}")
-            qty = st.number_input(f"Qty for {p['name']}", min_value=0, max_value=p['stock'], key=p['id'])
-            if qty > 0:
-                cart.append({"product": p, "quantity": qty})
-        
-        if cart:
-            st.subheader("Cart")
-            for item in cart:
-                st.write(f"{item['quantity']} x {item['product']['name']} = ${item['quantity']*item['product']['price']}")
-            total = calculate_cart_total(cart)
-            st.write(f"**Total: ${total}**")
-            if st.button("Checkout"):
-                save_order(user['username'], cart, total)
-                st.success("Order placed successfully!")
+        order_page(user)
 
 elif choice == "Admin":
     import admin
@@ -0,0 +1,227 @@
+"""
+admin.py
+Admin dashboard and reports pages of the shop.
+
+DataFrames and figures are memoized per data version in this imported
+module, so they outlive Streamlit's script reruns and are shared by every
+admin session until an order, product or user changes them.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from analytics import get_line_items
+from cache import memoize
+from catalog import get_catalog_index
+from database import (
+    GRANULARITIES, count_users, inventory_version, list_users, load_products, recent_orders,
+    sales_series, sales_summary, sales_version
+)
+from downsample import downsample
+from export import EXPORT_FORMATS, ExportError, export_sales_file, read_export
+from stock_monitor import get_stock_monitor
+
+CHART_POINTS = 1000   # points per trace sent to the browser, however long the history
+PIE_SLICES = 8        # categories beyond the top ones are merged into "Other"
+DOWNSAMPLING = {"LTTB (shape)": "lttb", "Min-max (peaks)": "minmax"}
+
+
+def _require_admin() -> bool:
+    if st.session_state.get("user_role") != "admin":
+        st.error("You don't have permission to access this page.")
+        return False
+    return True
+
+
+def trend_figure(rows, method="lttb", points=CHART_POINTS):
+    """Orders and revenue per bucket as WebGL lines, each downsampled to at most ``points``."""
+    buckets = np.array([row["bucket"].replace(" ", "T") for row in rows], dtype="datetime64[h]")
+    position = buckets.astype(np.int64).astype(np.float64)
+    fig = go.Figure(layout=dict(
+        title='Orders Over Time', hovermode='x unified',
+        yaxis=dict(title='Orders'), yaxis2=dict(title='Revenue', overlaying='y', side='right', showgrid=False),
+    ))
+    for name, axis in (("orders", "y"), ("revenue", "y2")):
+        values = np.array([row[name] for row in rows], dtype=np.float64)
+        keep = downsample(position, values, points, method)
+        fig.add_trace(go.Scattergl(x=buckets[keep].astype("datetime64[ms]"), y=values[keep],
+                                   name=name.title(), mode='lines', yaxis=axis))
+    return fig
+
+
+@memoize(sales_version)
+def _orders_figure(granularity, start, end, method):
+    rows = sales_series(granularity, start, end)
+    return (trend_figure(rows, method), len(rows)) if rows else (None, 0)
+
+
+@memoize(count_users)
+def _users_frame():
+    users_df = pd.DataFrame(list_users())
+    return users_df[['username', 'email', 'role', 'created_at']]
+
+
+@memoize(sales_version)
+def _recent_orders(limit):
+    return recent_orders(limit)
+
+
+@memoize(sales_version)
+def _date_bounds():
+    return get_line_items().date_bounds()
+
+
+@memoize(sales_version)
+def _sales_reports(start, end):
+    line_items = get_line_items()
+    product_sales = line_items.product_report(start, end).set_index('name')[['quantity', 'revenue', 'orders_count']]
+    # Order lines keep the category they were sold under
+    category_sales = line_items.category_report(start, end).set_index('category')
+    # Sorted by revenue, so the long tail collapses into one slice
+    slices = category_sales['revenue']
+    if len(slices) > PIE_SLICES:
+        slices = pd.concat([slices.iloc[:PIE_SLICES - 1],
+                            pd.Series({'Other': slices.iloc[PIE_SLICES - 1:].sum()})])
+    fig = px.pie(values=slices.values, names=slices.index, title='Revenue by Category')
+    return product_sales, category_sales, fig
+
+
+@memoize(inventory_version)
+def _inventory_frame():
+    return pd.DataFrame(load_products())[['name', 'category', 'price', 'stock']]
+
+
+def _at_risk_frame(k):
+    """The k products with the fewest days of cover, read off the stock monitor's heap."""
+    monitor = get_stock_monitor()
+    by_id = get_catalog_index().by_id
+    rows = [dict(row, name=by_id[row['id']]['name'], category=by_id[row['id']]['category'])
+            for row in monitor.at_risk(k) if row['id'] in by_id]
+    frame = pd.DataFrame(rows, columns=['name', 'category', 'stock', 'daily_demand', 'days_of_cover',
+                                        'reorder_point', 'reorder'])
+    return frame, monitor.below_reorder_point()
+
+
+def dashboard():
+    """Shop metrics, order trends, recent orders and the user list, for admins only."""
+    if not _require_admin():
+        return
+    st.title("Admin Dashboard")
+
+    # Key metrics (precomputed as orders are appended)
+    summary = sales_summary()
+    total_orders = summary["orders"]
+    total_revenue = summary["revenue"]
+    total_users = count_users()
+    avg_order_value = summary["avg_order_value"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Orders", total_orders)
+    col2.metric("Total Revenue", f"${total_revenue:,.2f}")
+    col3.metric("Total Users", total_users)
+    col4.metric("Average Order Value", f"${avg_order_value:,.2f}")
+
+    # Order trend chart, bucketed from the sales rollups
+    st.subheader("Order Trends")
+    first_day, last_day = _date_bounds()
+    if first_day is not None:
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            date_range = st.date_input("Period", value=(first_day, last_day), min_value=first_day,
+                                       max_value=last_day, key="trend_period")
+        with col2:
+            granularity = st.selectbox("Granularity", GRANULARITIES, index=GRANULARITIES.index("day"),
+                                       format_func=str.title, key="trend_granularity")
+        with col3:
+            method = st.selectbox("Downsampling", list(DOWNSAMPLING), key="trend_downsampling")
+        start, end = (date_range[0].isoformat(), date_range[-1].isoformat()) if date_range else (None, None)
+        fig, buckets = _orders_figure(granularity, start, end, DOWNSAMPLING[method])
+    else:
+        fig = None
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+        if buckets > CHART_POINTS:
+            st.caption(f"{buckets:,} {granularity}s downsampled to {CHART_POINTS:,} points per series")
+    else:
+        st.info("No orders data available for visualization.")
+
+    # Recent orders
+    st.subheader("Recent Orders")
+    latest_orders = _recent_orders(5)
+    if latest_orders:
+        for order in latest_orders:
+            st.write(f"**Order #{order['order_id']}** - {order['order_date']} - ${order['total']} - {order['status']}")
+    else:
+        st.info("No recent orders.")
+
+    # User management
+    st.subheader("User Management")
+    st.dataframe(_users_frame(), use_container_width=True)
+
+
+def reports():
+    """Sales reports with export, and the inventory report, for admins only."""
+    if not _require_admin():
+        return
+    st.title("Reports")
+
+    # Sales report
+    st.subheader("Sales Report")
+    first_day, last_day = _date_bounds()
+    if first_day is not None:
+        date_range = st.date_input("Report period", value=(first_day, last_day),
+                                   min_value=first_day, max_value=last_day)
+        start, end = (date_range[0], date_range[-1]) if date_range else (None, None)
+        product_sales, category_sales, fig = _sales_reports(start, end)
+
+        st.write("**Top Selling Products by Revenue**")
+        st.dataframe(product_sales, use_container_width=True)
+
+        st.write("**Sales by Category**")
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Export options: built only when asked for, streamed from the ledger in chunks
+        st.write("**Export Sales Report**")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS))
+        with col2:
+            export_category = st.selectbox("Category", ["All"] + sorted(category_sales.index))
+        with col3:
+            st.write("")
+            prepare = st.button("Prepare export")
+
+        # The file is read into memory for the button on this run only, then deleted
+        if prepare:
+            try:
+                path = export_sales_file(export_format, start, end,
+                                         None if export_category == "All" else export_category)
+                data = read_export(path)
+            except ExportError as exc:
+                st.error(str(exc))
+            else:
+                _, extension, mime = EXPORT_FORMATS[export_format]
+                st.download_button(
+                    label=f"Download Sales Report ({export_format})",
+                    data=data,
+                    file_name=f"sales_report.{extension}",
+                    mime=mime
+                )
+    else:
+        st.info("No sales data available for reporting.")
+
+    # Inventory report
+    st.subheader("Inventory Report")
+    st.dataframe(_inventory_frame(), use_container_width=True)
+
+    # Low stock: days of cover at the forecast daily demand, against each product's reorder point
+    st.write("**Stock at Risk**")
+    top_k = st.number_input("Products to show", min_value=1, max_value=100, value=10, key="at_risk_count")
+    at_risk, below = _at_risk_frame(int(top_k))
+    if below:
+        st.warning(f"**Low Stock Alert**: {below} products at or below their reorder point")
+    st.dataframe(at_risk.style.format({'daily_demand': '{:.1f}', 'days_of_cover': '{:.1f}'}),
+                 use_container_width=True, hide_index=True)
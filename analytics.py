@@ -0,0 +1,218 @@
+"""
+analytics.py
+Columnar copy of the order line items with vectorized sales reports.
+"""
+
+import functools
+import threading
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from database import connection
+
+FETCH_CHUNK = 50_000
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _locked(method):
+    # Reports read several columns; hold the lock so a concurrent refresh
+    # cannot grow the arrays between those reads.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _day_number(value: date) -> int:
+    return int((np.datetime64(value, "D") - _EPOCH).astype(np.int64))
+
+
+class LineItemStore:
+    """Order line items held as parallel NumPy columns.
+
+    The store is append-only like the ledger it mirrors: ``refresh`` pulls in
+    lines from orders newer than the last one seen, so each report call costs
+    one small query plus vectorized work over the columns.
+    """
+
+    COLUMNS = {
+        "order_id": np.int64,
+        "day": np.int32,          # days since 1970-01-01
+        "product": np.int32,      # dense code into product_ids
+        "category": np.int16,     # dense code into categories
+        "quantity": np.int32,
+        "revenue": np.float64,    # exact price * quantity of the line
+    }
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.size = 0
+        self.last_order_id = 0
+        self.columns = {name: np.empty(1024, dtype) for name, dtype in self.COLUMNS.items()}
+        self.product_ids: List[int] = []
+        self.product_names: List[str] = []
+        self.product_categories: List[int] = []
+        self.product_index: Dict[int, int] = {}
+        self.categories: List[str] = []
+        self.category_index: Dict[str, int] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+    def _category_code(self, category: str) -> int:
+        code = self.category_index.get(category)
+        if code is None:
+            code = self.category_index[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def _product_code(self, product_id: int, name: str, category: int) -> int:
+        code = self.product_index.get(product_id)
+        if code is None:
+            code = self.product_index[product_id] = len(self.product_ids)
+            self.product_ids.append(product_id)
+            self.product_names.append(name)
+            self.product_categories.append(category)
+        else:
+            # Report products under their most recent name and category
+            self.product_names[code] = name
+            self.product_categories[code] = category
+        return code
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        capacity = len(self.columns["order_id"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, values in self.columns.items():
+            grown = np.empty(capacity, values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+
+    def _append(self, rows: List[tuple]) -> None:
+        n = len(rows)
+        order_ids, dates, product_ids, names, categories, prices, quantities = zip(*rows)
+        category_codes = [self._category_code(c) for c in categories]
+        product_codes = [self._product_code(p, nm, c)
+                         for p, nm, c in zip(product_ids, names, category_codes)]
+        days = (np.array([d[:10] for d in dates], dtype="datetime64[D]") - _EPOCH).astype(np.int32)
+        quantity = np.array(quantities, dtype=np.int32)
+
+        self._reserve(n)
+        end = self.size + n
+        self.columns["order_id"][self.size:end] = order_ids
+        self.columns["day"][self.size:end] = days
+        self.columns["product"][self.size:end] = product_codes
+        self.columns["category"][self.size:end] = category_codes
+        self.columns["quantity"][self.size:end] = quantity
+        self.columns["revenue"][self.size:end] = np.array(prices, dtype=np.float64) * quantity
+        self.size = end
+        self.last_order_id = order_ids[-1]
+
+    def refresh(self) -> "LineItemStore":
+        """Load line items from orders appended since the last refresh."""
+        with self.lock:
+            with connection() as conn:
+                cur = conn.execute(
+                    "SELECT i.order_id, o.order_date, i.product_id, i.name, i.category, i.price, i.quantity "
+                    "FROM order_items i JOIN orders o ON o.order_id = i.order_id "
+                    "WHERE i.order_id > ? ORDER BY i.order_id, i.line_no",
+                    (self.last_order_id,),
+                )
+                while True:
+                    rows = cur.fetchmany(FETCH_CHUNK)
+                    if not rows:
+                        break
+                    self._append(rows)
+        return self
+
+    # ── Reports ------------------------------------------------------------
+    def _mask(self, start: Optional[date], end: Optional[date], category: Optional[str]) -> np.ndarray:
+        mask = np.ones(self.size, dtype=bool)
+        day = self.column("day")
+        if start is not None:
+            mask &= day >= _day_number(start)
+        if end is not None:
+            mask &= day <= _day_number(end)
+        if category is not None:
+            code = self.category_index.get(category, -1)
+            mask &= self.column("category") == code
+        return mask
+
+    @_locked
+    def product_report(self, start: Optional[date] = None, end: Optional[date] = None,
+                       category: Optional[str] = None) -> pd.DataFrame:
+        """Quantity, revenue and line count per product, highest revenue first."""
+        mask = self._mask(start, end, category)
+        codes = self.column("product")[mask]
+        n = len(self.product_ids)
+        quantity = np.bincount(codes, weights=self.column("quantity")[mask], minlength=n)
+        revenue = np.bincount(codes, weights=self.column("revenue")[mask], minlength=n)
+        lines = np.bincount(codes, minlength=n)
+        report = pd.DataFrame({
+            "product_id": self.product_ids,
+            "name": self.product_names,
+            "category": [self.categories[c] for c in self.product_categories],
+            "quantity": quantity.astype(np.int64),
+            "revenue": revenue,
+            "orders_count": lines,
+        })
+        report = report[report["orders_count"] > 0]
+        return report.sort_values("revenue", ascending=False).reset_index(drop=True)
+
+    @_locked
+    def category_report(self, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """Quantity and revenue per category, highest revenue first."""
+        mask = self._mask(start, end, None)
+        codes = self.column("category")[mask]
+        n = len(self.categories)
+        report = pd.DataFrame({
+            "category": self.categories,
+            "quantity": np.bincount(codes, weights=self.column("quantity")[mask], minlength=n).astype(np.int64),
+            "revenue": np.bincount(codes, weights=self.column("revenue")[mask], minlength=n),
+            "lines": np.bincount(codes, minlength=n),
+        })
+        report = report[report["lines"] > 0].drop(columns="lines")
+        return report.sort_values("revenue", ascending=False).reset_index(drop=True)
+
+    @_locked
+    def daily_report(self, start: Optional[date] = None, end: Optional[date] = None,
+                     category: Optional[str] = None) -> pd.DataFrame:
+        """Units and revenue per calendar day."""
+        mask = self._mask(start, end, category)
+        if not mask.any():
+            return pd.DataFrame({"day": pd.Series(dtype="datetime64[ns]"),
+                                 "quantity": pd.Series(dtype=np.int64),
+                                 "revenue": pd.Series(dtype=np.float64)})
+        day = self.column("day")[mask]
+        first = int(day.min())
+        offsets = day - first
+        quantity = np.bincount(offsets, weights=self.column("quantity")[mask])
+        revenue = np.bincount(offsets, weights=self.column("revenue")[mask])
+        present = np.bincount(offsets) > 0
+        days = _EPOCH + first + np.nonzero(present)[0]
+        return pd.DataFrame({"day": days.astype("datetime64[ns]"),
+                             "quantity": quantity[present].astype(np.int64),
+                             "revenue": revenue[present]})
+
+    @_locked
+    def date_bounds(self):
+        """Return the first and last sale dates, or ``(None, None)`` with no sales."""
+        if not self.size:
+            return None, None
+        day = self.column("day")
+        return (_EPOCH + int(day.min())).astype(date), (_EPOCH + int(day.max())).astype(date)
+
+
+_store = LineItemStore()
+
+
+def get_line_items() -> LineItemStore:
+    """Return the process-wide columnar store, caught up with the ledger."""
+    return _store.refresh()
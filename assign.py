@@ -2,91 +2,132 @@
 """
 main.py
 Orchestrate scraping, cleaning and saving of headlines from the Guardian.
-"""
-
 
+    python assign.py [URL ...]                      # one run
+    python assign.py --daemon --interval 900 --metrics-port 9108
 """
-scraper.py
-Responsible for network I/O and basic HTML parsing.
-"""
-
-import requests
-from bs4 import BeautifulSoup
-from typing import List
-
-class FetchError(RuntimeError):
-    """Raised when the network or HTML layer fails."""
-
-def fetch_headlines(url: str) -> List[str]:
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-    except requests.exceptions.RequestException as exc:
-        raise FetchError(f"Network failure: {exc}") from exc
-
-    try:
-        soup = BeautifulSoup(resp.text, "html.parser")
-    except Exception as exc:
-        raise FetchError(f"BeautifulSoup failure: {exc}") from exc
-
-    # The Guardian uses <h3> tags for most headlines
-    h3_tags = soup.find_all("h3")
-    if not h3_tags:
-        raise FetchError("No <h3> tags found – HTML structure may have changed.")
 
-    headlines = [h.get_text(strip=True) for h in h3_tags if h.get_text(strip=True)]
-    if not headlines:
-        raise FetchError("No text extracted from <h3> tags.")
-    return headlines
-
-from scraper import fetch_headlines
-from text_utils import clean_headlines, save_headlines
+from scraper import HeadlineCrawler
+from headline_store import HeadlineStore
+from metrics import Metrics
+from text_utils import HeadlineIndex, clean_headlines
+import argparse
+import random
+import signal
 import sys
+import threading
+import time
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
 
-def main():
+SOURCES = [
+    "https://www.theguardian.com/international",
+]
+
+def run_pipeline(crawler, index, store, urls, metrics):
+    """One fetch → clean → dedup → save pass; returns (saved, kept, sources ok).
+
+    Sources are cleaned and saved as soon as each one has downloaded, while
+    the crawler keeps fetching the rest. A failed source is logged and
+    counted, never fatal.
+    """
+    started = time.perf_counter()
+    kept = saved = ok = 0
+    for result in crawler.iter_crawl(urls):
+        metrics.observe("stage_seconds", result.elapsed, stage="fetch")
+        metrics.inc("fetched_bytes_total", result.bytes, source=result.url)
+        if not result.ok:
+            metrics.inc("errors_total", source=result.url)
+            logging.warning("⚠️ %s skipped after %d attempt(s): %s",
+                            result.url, result.attempts, result.error)
+            continue
+        ok += 1
+        if result.not_modified:
+            metrics.inc("not_modified_total", source=result.url)
+            continue
+        with metrics.timer("stage_seconds", stage="clean"):
+            cleaned = clean_headlines(result.headlines)
+        # Only headlines never kept by an earlier run are archived; they are
+        # marked as seen only once the store has flushed them
+        with metrics.timer("stage_seconds", stage="dedup"):
+            fresh = index.check_new(cleaned)
+        try:
+            with metrics.timer("stage_seconds", stage="save"):
+                store.append(fresh, source=result.url)
+                store.flush()
+        except Exception:
+            index.rollback()
+            raise
+        index.commit()
+        kept += len(cleaned)
+        saved += len(fresh)
+        metrics.inc("extracted_total", len(result.headlines), source=result.url)
+        metrics.inc("saved_total", len(fresh), source=result.url)
+    elapsed = time.perf_counter() - started
+    metrics.inc("runs_total")
+    metrics.set("last_run_seconds", elapsed)
+    metrics.set("last_run_timestamp", time.time())
+    metrics.set("headlines_per_second", kept / elapsed if elapsed else 0.0)
+    return saved, kept, ok
+
+def main(urls=None):
+    urls = urls or SOURCES
     try:
-        raw = fetch_headlines("https://www.theguardian.com/international")
-        cleaned = clean_headlines(raw)
-        save_headlines(cleaned, "headlines.txt")
-        logging.info("✅ Job finished – %d headlines saved.", len(cleaned))
+        with HeadlineCrawler() as crawler, HeadlineIndex("headlines.db") as index, \
+                HeadlineStore("headlines") as store:
+            saved, kept, ok = run_pipeline(crawler, index, store, urls, Metrics())
+        if not ok:
+            raise RuntimeError("every source failed")
+        logging.info("✅ Job finished – %d new of %d headlines saved.", saved, kept)
     except Exception as exc:
         logging.error("❌ Fatal error: %s", exc)
         sys.exit(1)
 
-if __name__ == "__main__":
-    main()
+def run_daemon(urls=None, interval=900.0, jitter=0.1, metrics_port=None, metrics_json=None):
+    """Run the pipeline every ``interval`` seconds (± ``jitter`` fraction) until SIGINT/SIGTERM.
 
+    The crawler, dedup index and archive stay open between runs, so
+    conditional GETs turn unchanged pages into cheap 304s.
     """
-text_utils.py
-Clean, deduplicate and persist headlines.
-"""
+    urls = urls or SOURCES
+    metrics = Metrics()
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    server = metrics.serve(metrics_port) if metrics_port else None
+    with HeadlineCrawler() as crawler, HeadlineIndex("headlines.db") as index, \
+            HeadlineStore("headlines") as store:
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                saved, kept, ok = run_pipeline(crawler, index, store, urls, metrics)
+                logging.info("✅ Run finished – %d new of %d headlines saved from %d/%d source(s).",
+                             saved, kept, ok, len(urls))
+            except Exception as exc:
+                metrics.inc("errors_total", source="pipeline")
+                logging.error("❌ Run failed: %s", exc)
+            if metrics_json:
+                try:
+                    metrics.write_json(metrics_json)
+                except OSError as exc:
+                    logging.warning("⚠️ Cannot write metrics to %s: %s", metrics_json, exc)
+            delay = interval * random.uniform(1 - jitter, 1 + jitter) - (time.monotonic() - started)
+            stop.wait(max(0.0, delay))
+    if server is not None:
+        server.shutdown()
+    logging.info("Scheduler stopped.")
 
-import string
-from typing import List
-
-STOP_WORDS = {"live", "video", "podcast", "sport"}   # simple filter example
-
-def clean_headlines(raw: List[str]) -> List[str]:
-    cleaned = []
-    seen = set()
-    for line in raw:
-        # basic string cleaning
-        line = line.strip()
-        line = line.translate(str.maketrans("", "", string.punctuation))
-        line = line.title()
-        if line and line not in seen:
-            if not any(sw in line.lower() for sw in STOP_WORDS):
-                cleaned.append(line)
-                seen.add(line)
-    return cleaned
-
-def save_headlines(headlines: List[str], path: str) -> None:
-    try:
-        with open(path, "w", encoding="utf-8") as fh:
-            for h in headlines:
-                fh.write(h + "\n")
-    except OSError as exc:
-        raise RuntimeError(f"Cannot save file: {exc}") from exc
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape, clean and archive headlines.")
+    parser.add_argument("urls", nargs="*", help=f"pages to scrape (default: {', '.join(SOURCES)})")
+    parser.add_argument("--daemon", action="store_true", help="keep running on a schedule")
+    parser.add_argument("--interval", type=float, default=900.0, help="seconds between runs")
+    parser.add_argument("--jitter", type=float, default=0.1, help="random ± fraction of the interval")
+    parser.add_argument("--metrics-port", type=int, help="serve /metrics and /metrics.json on this port")
+    parser.add_argument("--metrics-json", help="rewrite this JSON file after every run")
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.urls, args.interval, args.jitter, args.metrics_port, args.metrics_json)
+    else:
+        main(args.urls)
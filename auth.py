@@ -0,0 +1,214 @@
+"""
+auth.py
+Password hashing with pluggable slow KDFs, run in a bounded worker pool,
+and the login / registration forms built on it.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Dict, Optional
+
+import streamlit as st
+
+from database import DuplicateUserError, create_user, get_user, get_user_by_email
+from utils import flash
+
+HASH_WORKERS = int(os.environ.get("COMMANDERGH_HASH_WORKERS", "4"))
+HASH_QUEUE = HASH_WORKERS * 8     # hashing jobs allowed to wait for a worker
+HASH_TIMEOUT = 10.0               # seconds a caller waits for a slot or a result
+
+
+class AuthError(RuntimeError):
+    """Raised when a password cannot be hashed or verified."""
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+class PasswordHasher(ABC):
+    """Base class for KDF backends; encoded hashes look like ``name$params$salt$digest``."""
+
+    name = ""
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        params = self.params()
+        return "$".join([self.name, params, _b64(salt), _b64(self.derive(password, salt, params))])
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            _, params, salt, digest = encoded.split("$")
+            expected = base64.b64decode(digest)
+            actual = self.derive(password, base64.b64decode(salt), params)
+        except (ValueError, TypeError):
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    @abstractmethod
+    def params(self) -> str:
+        """The cost parameters of new hashes, encoded as text."""
+
+    @abstractmethod
+    def derive(self, password: str, salt: bytes, params: str) -> bytes:
+        """Derive the key for ``password`` with the given salt and encoded parameters."""
+
+
+class ScryptHasher(PasswordHasher):
+    name = "scrypt"
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1):
+        self.n, self.r, self.p = n, r, p
+
+    def params(self) -> str:
+        return f"{self.n},{self.r},{self.p}"
+
+    def derive(self, password: str, salt: bytes, params: str) -> bytes:
+        n, r, p = (int(v) for v in params.split(","))
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * r * n + 2 ** 20, dklen=32)
+
+
+class PBKDF2Hasher(PasswordHasher):
+    name = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int = 600_000):
+        self.iterations = iterations
+
+    def params(self) -> str:
+        return str(self.iterations)
+
+    def derive(self, password: str, salt: bytes, params: str) -> bytes:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, int(params))
+
+
+HASHERS: Dict[str, PasswordHasher] = {}
+
+
+def register_hasher(hasher: PasswordHasher) -> None:
+    HASHERS[hasher.name] = hasher
+
+
+register_hasher(ScryptHasher())
+register_hasher(PBKDF2Hasher())
+DEFAULT_HASHER = os.environ.get("COMMANDERGH_HASHER", "scrypt")
+
+
+def _hash_sync(password: str) -> str:
+    return HASHERS[DEFAULT_HASHER].hash(password)
+
+
+def _verify_sync(password: str, encoded: Optional[str]) -> bool:
+    if not encoded:
+        # Unknown user: spend the same effort so timing does not reveal it
+        _hash_sync(password)
+        return False
+    hasher = HASHERS.get(encoded.split("$", 1)[0])
+    return hasher is not None and hasher.verify(password, encoded)
+
+
+# ── Bounded worker pool -----------------------------------------------------
+# hashlib releases the GIL while deriving keys, so script threads stay
+# responsive; the semaphore caps how much work a login burst can queue.
+_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="pwhash")
+_slots = threading.BoundedSemaphore(HASH_QUEUE)
+
+
+def _submit(fn, *args) -> Future:
+    if not _slots.acquire(timeout=HASH_TIMEOUT):
+        raise AuthError("Too many sign-in attempts in progress, please retry")
+    future = _pool.submit(fn, *args)
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def hash_password_async(password: str) -> Future:
+    return _submit(_hash_sync, password)
+
+
+def verify_password_async(password: str, encoded: Optional[str]) -> Future:
+    return _submit(_verify_sync, password, encoded)
+
+
+def hash_password(password: str) -> str:
+    return hash_password_async(password).result(timeout=HASH_TIMEOUT)
+
+
+def verify_password(password: str, encoded: Optional[str]) -> bool:
+    """Check a password against a stored hash in constant time."""
+    return verify_password_async(password, encoded).result(timeout=HASH_TIMEOUT)
+
+
+# ── Session forms -----------------------------------------------------------
+def current_user() -> Optional[Dict]:
+    if not st.session_state.get("logged_in"):
+        return None
+    return {"username": st.session_state.user_id, "role": st.session_state.user_role}
+
+
+def login() -> Optional[Dict]:
+    """Render the login form; returns the signed-in user, or None."""
+    user = current_user()
+    if user is not None:
+        return user
+    with st.form("Login"):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        if st.form_submit_button("Login"):
+            user = get_user(username)
+            try:
+                verified = verify_password(password, user["password"] if user else None)
+            except (AuthError, FutureTimeout):
+                st.error("Sign-in is busy right now, please try again in a moment.")
+                return None
+            if verified:
+                st.session_state.logged_in = True
+                st.session_state.user_role = user["role"]
+                st.session_state.user_id = username
+                flash(f"Logged in successfully as {username}!", toast=True)
+                st.rerun()
+            else:
+                st.error("Invalid username or password")
+    return None
+
+
+def register(role: str = "customer") -> None:
+    """Render the registration form and create the account on submit."""
+    with st.form("Register"):
+        username = st.text_input("Username")
+        email = st.text_input("Email")
+        password = st.text_input("Password", type="password")
+        confirm_password = st.text_input("Confirm Password", type="password")
+        if not st.form_submit_button("Register"):
+            return
+    if password != confirm_password:
+        st.error("Passwords do not match")
+    elif get_user(username):
+        st.error("Username already exists")
+    elif get_user_by_email(email):
+        st.error("Email already registered")
+    else:
+        try:
+            create_user(username, hash_password(password), email, role,
+                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        except DuplicateUserError:
+            st.error("Username already exists")
+            return
+        except (AuthError, FutureTimeout):
+            st.error("Registration is busy right now, please try again in a moment.")
+            return
+        flash("Registration successful! Please login.")
+        st.rerun()
+
+
+def logout() -> None:
+    st.session_state.logged_in = False
+    st.session_state.user_role = None
+    st.session_state.user_id = None
+    st.session_state.pop("orders_cursors", None)   # order history paging belongs to the user
@@ -0,0 +1,58 @@
+"""
+charts.py
+Build time and browser payload of the Order Trends chart as the history grows,
+full-resolution px.line against the downsampled WebGL figure.
+
+    python -m benchmarks.charts --years 1 5 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from admin import CHART_POINTS, trend_figure
+from downsample import METHODS
+
+
+def synthetic_hours(years: int, seed: int = 0):
+    """Hourly order counts and revenue with a trend, a daily cycle and noise."""
+    rng = np.random.default_rng(seed)
+    hours = np.arange(np.datetime64("2026-01-01T00"), np.datetime64("2026-01-01T00") + years * 365 * 24)
+    base = 5 + 3 * np.sin(np.arange(len(hours)) / 24 * 2 * np.pi) + np.linspace(0, 10, len(hours))
+    orders = rng.poisson(np.clip(base, 0.1, None))
+    revenue = orders * rng.uniform(20, 200, len(hours))
+    labels = np.datetime_as_string(hours, unit="h")
+    return [{"bucket": b.replace("T", " "), "orders": int(o), "revenue": float(r)}
+            for b, o, r in zip(labels, orders, revenue)]
+
+
+def measure(build) -> tuple:
+    started = time.perf_counter()
+    fig = build()
+    built = time.perf_counter() - started
+    return built, len(fig.to_json())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10], help="hourly history lengths")
+    parser.add_argument("--points", type=int, default=CHART_POINTS, help="point budget per series")
+    args = parser.parse_args()
+
+    print(f"{'history':>9} {'buckets':>8} {'figure':>14} {'build ms':>9} {'payload KB':>11}")
+    for years in args.years:
+        rows = synthetic_hours(years)
+        frame = pd.DataFrame(rows)
+        builds = {"px.line": lambda: px.line(frame, x="bucket", y="orders", title="Orders Over Time")}
+        for method in METHODS:
+            builds[f"scattergl/{method}"] = lambda m=method: trend_figure(rows, m, args.points)
+        for label, build in builds.items():
+            built, payload = measure(build)
+            print(f"{years:>7} y {len(rows):>8,} {label:>14} {built * 1000:>9.1f} {payload / 1024:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+crawl.py
+Run the headline crawler against a local stand-in HTTP server: compare it
+with one-at-a-time fetching, then check retries and conditional GETs.
+
+    python -m benchmarks.crawl --pages 40 --latency-ms 100
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scraper import HeadlineCrawler, fetch_headlines
+
+
+def make_handler(latency: float, headlines_per_page: int):
+    failures_left = {}
+    lock = threading.Lock()
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"    # keep-alive, like a real news site
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path.startswith("/flaky/"):
+                # Fail the first two requests for each flaky page
+                with lock:
+                    left = failures_left.setdefault(self.path, 2)
+                    failures_left[self.path] = left - 1
+                if left > 0:
+                    self._send(503, b"busy", {"Retry-After": "0"})
+                    return
+            body = "".join(
+                f"<div><h3> {self.path} story {i}: something happened </h3></div>"
+                for i in range(headlines_per_page)
+            ).encode()
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", {"ETag": etag})
+                return
+            self._send(200, b"<html><body>" + body + b"</body></html>", {"ETag": etag})
+
+        def _send(self, status, body, headers):
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return StandInHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000, 30))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base}/section/{i}" for i in range(args.pages)]
+
+    started = time.perf_counter()
+    sequential = [fetch_headlines(url) for url in urls]
+    sequential_s = time.perf_counter() - started
+
+    with HeadlineCrawler(max_workers=args.workers, per_host=args.per_host, min_interval=0,
+                         backoff=0.01) as crawler:
+        started = time.perf_counter()
+        first = crawler.crawl(urls)
+        crawl_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        second = crawler.crawl(urls)
+        revisit_s = time.perf_counter() - started
+
+        flaky = crawler.crawl([f"{base}/flaky/{i}" for i in range(4)])
+
+    server.shutdown()
+    assert all(r.ok for r in first) and [r.headlines for r in first] == sequential
+    print(f"{'sequential fetch_headlines':>28}: {sequential_s:6.2f} s for {args.pages} pages")
+    print(f"{'crawler, first pass':>28}: {crawl_s:6.2f} s ({sequential_s / crawl_s:.1f}x faster)")
+    print(f"{'crawler, revisit':>28}: {revisit_s:6.2f} s, "
+          f"{sum(r.not_modified for r in second)}/{len(second)} answered 304, "
+          f"{sum(r.bytes for r in second)} bytes vs {sum(r.bytes for r in first)}")
+    print(f"{'flaky pages recovered':>28}: {sum(r.ok for r in flaky)}/{len(flaky)} "
+          f"after {max(r.attempts for r in flaky)} attempts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+extract.py
+Compare BeautifulSoup and streaming headline extraction on large pages:
+CPU time and peak traced memory per page.
+
+    python -m benchmarks.extract                  # synthetic 5 MB page
+    python -m benchmarks.extract saved_page.html  # real saved pages
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from scraper import STREAM_CHUNK, iter_headlines, parse_headlines
+
+
+def synthetic_page(size_mb: float, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    words = "minister storm market election court climate league crisis deal report".split()
+    parts, size = ["<html><head><title>Front</title></head><body>"], 0
+    while size < size_mb * 1024 * 1024:
+        headline = " ".join(rng.choice(words) for _ in range(rng.randint(5, 12))).capitalize()
+        block = (
+            '<div class="card"><a href="/story/%d"><h3 class="headline"><span>%s</span> &amp; more</h3></a>'
+            '<p>%s</p><ul>%s</ul></div>\n'
+            % (rng.randint(1, 10 ** 6), headline, " ".join(rng.choice(words) for _ in range(40)),
+               "".join(f"<li><a href='/t/{w}'>{w}</a></li>" for w in rng.sample(words, 4)))
+        )
+        parts.append(block)
+        size += len(block)
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def measure(fn):
+    # Time without tracemalloc, which slows allocation-heavy code many times over
+    started = time.process_time()
+    result = fn()
+    cpu = time.process_time() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, cpu, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", help="saved HTML pages; a synthetic page is used if omitted")
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--selector", action="append", help="repeatable; defaults to h3")
+    args = parser.parse_args()
+    selectors = tuple(args.selector or ["h3"])
+
+    pages = [(path, open(path, "rb").read()) for path in args.files] or \
+            [(f"synthetic {args.size_mb:g} MB", synthetic_page(args.size_mb))]
+    for name, body in pages:
+        chunks = [body[i:i + STREAM_CHUNK] for i in range(0, len(body), STREAM_CHUNK)]
+        soup, soup_cpu, soup_peak = measure(lambda: parse_headlines(body.decode("utf-8", "replace"), selectors))
+        stream, stream_cpu, stream_peak = measure(lambda: list(iter_headlines(iter(chunks), selectors)))
+        assert soup == stream, "extractors disagree"
+        print(f"{name}: {len(body) / 1e6:.1f} MB, {len(soup)} headlines")
+        print(f"  {'BeautifulSoup':>14}: {soup_cpu * 1000:8.1f} ms CPU  {soup_peak / 1e6:7.1f} MB peak")
+        print(f"  {'streaming':>14}: {stream_cpu * 1000:8.1f} ms CPU  {stream_peak / 1e6:7.1f} MB peak")
+        print(f"  {'improvement':>14}: {soup_cpu / stream_cpu:8.1f}x CPU  {soup_peak / stream_peak:7.1f}x memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+inventory_stress.py
+Drive thousands of concurrent simulated checkouts through the inventory engine
+and check that no product is ever oversold.
+
+    python -m benchmarks.inventory_stress --checkouts 5000 --threads 64
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+from database import OutOfStockError
+from inventory import InventoryEngine
+
+
+def run(checkouts: int, threads: int, skus: int, hot_skus: int, stock: int, stripes: int) -> dict:
+    database.DB_PATH = os.path.join(tempfile.mkdtemp(), "inventory_stress.db")
+    database.upsert_products([
+        {"id": i, "name": f"SKU {i}", "price": 10.0, "category": "Bench", "stock": stock}
+        for i in range(1, skus + 1)
+    ])
+    initial = {i: database.read_stock(i) for i in range(1, skus + 1)}
+    engine = InventoryEngine(stripes=stripes)
+    counts = {"purchased": 0, "rejected_at_cart": 0, "rejected_at_checkout": 0}
+    counts_lock = threading.Lock()
+    sold = {i: 0 for i in initial}
+
+    def shopper(seed: int) -> None:
+        rng = random.Random(seed)
+        holder = uuid.uuid4().hex
+        lines = {}
+        for _ in range(rng.randint(1, 4)):
+            # Most traffic lands on a handful of hot SKUs
+            product_id = rng.randint(1, hot_skus) if rng.random() < 0.8 else rng.randint(1, skus)
+            quantity = rng.randint(1, 3)
+            if engine.reserve(holder, product_id, quantity):
+                lines[product_id] = lines.get(product_id, 0) + quantity
+            else:
+                with counts_lock:
+                    counts["rejected_at_cart"] += 1
+        if not lines:
+            return
+        try:
+            engine.purchase(holder, lines)
+        except OutOfStockError:
+            engine.release_all(holder, lines)
+            with counts_lock:
+                counts["rejected_at_checkout"] += 1
+            return
+        with counts_lock:
+            counts["purchased"] += 1
+            for product_id, quantity in lines.items():
+                sold[product_id] += quantity
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(shopper, range(checkouts)))
+    elapsed = time.perf_counter() - started
+
+    final = {i: database.read_stock(i) for i in initial}
+    oversold = [i for i in initial if final[i] < 0 or initial[i] - final[i] != sold[i]]
+    return {
+        **counts,
+        "checkouts": checkouts,
+        "threads": threads,
+        "seconds": round(elapsed, 3),
+        "checkouts_per_second": round(checkouts / elapsed, 1),
+        "units_sold": sum(sold.values()),
+        "oversold_skus": oversold,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checkouts", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--skus", type=int, default=1000)
+    parser.add_argument("--hot-skus", type=int, default=5)
+    parser.add_argument("--stock", type=int, default=200)
+    parser.add_argument("--stripes", type=int, default=64)
+    args = parser.parse_args()
+    result = run(args.checkouts, args.threads, args.skus, args.hot_skus, args.stock, args.stripes)
+    for key, value in result.items():
+        print(f"{key:>22}: {value}")
+    if result["oversold_skus"]:
+        raise SystemExit("❌ Stock accounting mismatch")
+
+
+if __name__ == "__main__":
+    main()
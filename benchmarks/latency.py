@@ -0,0 +1,100 @@
+"""
+latency.py
+Check the login, registration and checkout submits of Cmdgh.py against a
+latency budget, driving the real script headlessly with Streamlit's AppTest.
+
+    python -m benchmarks.latency --runs 5 --budget-ms 750
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cmdgh.py")
+
+
+def _app() -> AppTest:
+    return AppTest.from_file(APP, default_timeout=60).run()
+
+
+def _timed_run(at: AppTest) -> float:
+    started = time.perf_counter()
+    at.run()
+    return time.perf_counter() - started
+
+
+def _button(at: AppTest, label: str):
+    return next(b for b in at.button if b.label == label)
+
+
+def _login(username: str, password: str) -> AppTest:
+    at = _app()
+    at.text_input[0].input(username)
+    at.text_input[1].input(password)
+    _button(at, "Login").click()
+    return at
+
+
+def login_flow() -> float:
+    at = _login("customer", "customer123")
+    elapsed = _timed_run(at)
+    assert at.session_state.logged_in, "login failed"
+    return elapsed
+
+
+def register_flow() -> float:
+    at = _app()
+    at.radio[0].set_value("Register").run()
+    name = f"bench_{uuid.uuid4().hex[:12]}"
+    for widget, value in zip(at.text_input, [name, f"{name}@example.com", "secret", "secret"]):
+        widget.input(value)
+    _button(at, "Register").click()
+    elapsed = _timed_run(at)
+    assert not at.error, [e.value for e in at.error]
+    return elapsed
+
+
+def checkout_flow() -> float:
+    at = _login("customer", "customer123")
+    at.run()
+    at.sidebar.radio[0].set_value("Products").run()
+    _button(at, "Add to Cart").click().run()
+    at.sidebar.radio[0].set_value("Cart").run()
+    _button(at, "Proceed to Checkout").click().run()
+    at.text_input[0].input("Bench Shopper")
+    _button(at, "Complete Purchase").click()
+    elapsed = _timed_run(at)
+    assert not at.session_state.cart, "order was not placed"
+    return elapsed
+
+
+FLOWS = {"login": login_flow, "register": register_flow, "checkout": checkout_flow}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=750.0,
+                        help="maximum allowed median latency of each submit")
+    args = parser.parse_args()
+
+    os.environ["COMMANDERGH_DB"] = os.path.join(tempfile.mkdtemp(), "latency.db")
+    over_budget = []
+    for name, flow in FLOWS.items():
+        samples = [flow() * 1000 for _ in range(args.runs)]
+        median = statistics.median(samples)
+        print(f"{name:>10}: median {median:7.1f} ms   max {max(samples):7.1f} ms")
+        if median > args.budget_ms:
+            over_budget.append(name)
+    if over_budget:
+        raise SystemExit(f"❌ Over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+    print(f"✅ All submits within {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
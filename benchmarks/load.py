@@ -0,0 +1,229 @@
+"""
+load.py
+Load-test the Cmdgh.py storefront with many concurrent headless shoppers
+and report p50/p95/p99 latency per page.
+
+Each virtual shopper drives the real script through Streamlit's AppTest:
+login -> Products -> Add to Cart -> Cart -> Complete Purchase. A share of
+the users are admins who open Reports and the Admin Dashboard instead.
+AppTest keeps process-global state, so concurrent shoppers run in separate
+worker processes sharing one database, like several server workers would.
+
+    python -m benchmarks.load --users 40 --concurrency 8 --products 2000 --orders 20000 \\
+        --out results.json
+    python -m benchmarks.load ... --compare results.json    # show the change per page
+"""
+
+import argparse
+import json
+import os
+import platform
+import multiprocessing
+import random
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cmdgh.py")
+CATEGORIES = ["Electronics", "Home", "Garden", "Toys", "Fashion", "Kitchen"]
+
+
+class Recorder:
+    """Latency samples per page for one flow, run inside a worker process."""
+
+    def __init__(self):
+        self.samples: List[Tuple[str, float]] = []
+
+    def timed(self, page: str, at):
+        started = time.perf_counter()
+        at.run()
+        self.samples.append((page, (time.perf_counter() - started) * 1000))
+        if at.exception:
+            raise RuntimeError(f"{page}: {at.exception[0].value}")
+        return at
+
+
+def summarize(samples: List[Tuple[str, float]]) -> Dict[str, Dict[str, float]]:
+    by_page: Dict[str, List[float]] = {}
+    for page, elapsed in samples:
+        by_page.setdefault(page, []).append(elapsed)
+    pages = {}
+    for page, values in sorted(by_page.items()):
+        values = np.asarray(values)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        pages[page] = {"count": len(values), "mean": float(values.mean()), "p50": float(p50),
+                       "p95": float(p95), "p99": float(p99), "max": float(values.max())}
+    return pages
+
+
+def seed(products: int, orders: int, rng: random.Random) -> None:
+    """Grow the catalog and order ledger to the requested volumes."""
+    from database import append_order, load_products, update_product, upsert_products
+
+    existing = load_products()
+    start = max(p["id"] for p in existing) + 1
+    upsert_products([
+        {"id": i, "name": f"Product {i:06d}", "price": round(rng.uniform(1, 500), 2),
+         "category": rng.choice(CATEGORIES), "stock": 10 ** 6}
+        for i in range(start, products + 1)
+    ])
+    for p in existing:
+        update_product(p["id"], stock=10 ** 6)   # checkouts must not run out mid-test
+    catalog = load_products()
+    first_day = datetime.now() - timedelta(days=365)
+    new_orders = []
+    for _ in range(orders):
+        items = [dict(p, quantity=rng.randint(1, 3)) for p in rng.sample(catalog, rng.randint(1, 4))]
+        new_orders.append({
+            "user_id": "customer", "items": items,
+            "total": round(sum(i["price"] * i["quantity"] for i in items), 2),
+            "order_date": (first_day + timedelta(minutes=rng.randint(0, 365 * 24 * 60))).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    # Many appends in flight at once let the order writer group-commit them
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        list(pool.map(append_order, new_orders))
+
+
+def _button(at, label: str, rng: random.Random = None):
+    buttons = [b for b in at.button if b.label == label]
+    return rng.choice(buttons) if rng else buttons[0]
+
+
+def _login(rec: Recorder, username: str, password: str):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    at.text_input[0].input(username)
+    at.text_input[1].input(password)
+    _button(at, "Login").click()
+    rec.timed("login", at)
+    if not at.session_state.logged_in:
+        raise RuntimeError("login failed")
+    return rec.timed("home", at)
+
+
+def shopper_flow(rec: Recorder, rng: random.Random) -> None:
+    at = _login(rec, "customer", "customer123")
+    at.sidebar.radio[0].set_value("Products")
+    rec.timed("products", at)
+    _button(at, "Add to Cart", rng).click()
+    rec.timed("add_to_cart", at)
+    at.sidebar.radio[0].set_value("Cart")
+    rec.timed("cart", at)
+    _button(at, "Proceed to Checkout").click()
+    rec.timed("checkout_form", at)
+    at.text_input[0].input("Load Test")
+    _button(at, "Complete Purchase").click()
+    rec.timed("checkout", at)
+    if at.session_state.cart:
+        raise RuntimeError("order was not placed")
+
+
+def admin_flow(rec: Recorder, rng: random.Random) -> None:
+    at = _login(rec, "admin", "admin123")
+    at.sidebar.radio[0].set_value("Reports")
+    rec.timed("reports", at)
+    rec.timed("reports_rerun", at)
+    at.sidebar.radio[0].set_value("Admin Dashboard")
+    rec.timed("dashboard", at)
+
+
+FLOWS = {"shopper": shopper_flow, "admin": admin_flow}
+
+
+def run_flow(job: Tuple[str, int]) -> Tuple[List[Tuple[str, float]], Optional[str]]:
+    """Worker entry point: run one flow, return its samples and any error."""
+    name, flow_seed = job
+    rec = Recorder()
+    try:
+        FLOWS[name](rec, random.Random(flow_seed))
+    except Exception as exc:
+        return rec.samples, f"{name}: {exc}"
+    return rec.samples, None
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict, baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    print(f"\nChange against {baseline_path} ({baseline['meta']['revision']}):")
+    for page, stats in current["pages"].items():
+        old = baseline["pages"].get(page)
+        if old is None:
+            print(f"{page:>14}  new page")
+            continue
+        deltas = "  ".join(f"{q} {(stats[q] - old[q]) / old[q] * 100:+6.1f}%" for q in ("p50", "p95", "p99"))
+        print(f"{page:>14}  {deltas}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20, help="virtual users (flows) to run in total")
+    parser.add_argument("--concurrency", type=int, default=4, help="flows running at once")
+    parser.add_argument("--admin-share", type=float, default=0.2, help="fraction of users running the admin flow")
+    parser.add_argument("--products", type=int, default=500, help="catalog size")
+    parser.add_argument("--orders", type=int, default=5000, help="orders already in the ledger")
+    parser.add_argument("--db", help="database to test against (default: a fresh temporary one)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    os.environ["COMMANDERGH_DB"] = args.db or os.path.join(tempfile.mkdtemp(), "load.db")
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    seed(args.products, args.orders, rng)
+    print(f"Seeded {args.products} products and {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+    flows = [("admin" if rng.random() < args.admin_share else "shopper", args.seed * 100_003 + i)
+             for i in range(args.users)]
+    samples, errors = [], {}
+    # Pickle the worker by its module path: AppTest swaps out __main__ in the workers
+    from benchmarks.load import run_flow
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.concurrency,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        for flow_samples, error in pool.map(run_flow, flows):
+            samples += flow_samples
+            if error:
+                flow = error.split(":", 1)[0]
+                errors[flow] = errors.get(flow, 0) + 1
+                print(f"⚠️ {error}")
+    wall = time.perf_counter() - started
+
+    results = {
+        "meta": {"revision": _git_revision(), "timestamp": datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "args": vars(args), "wall_seconds": wall,
+                 "flows_per_second": len(flows) / wall},
+        "pages": summarize(samples),
+        "errors": errors,
+    }
+    print(f"\n{len(flows)} flows at concurrency {args.concurrency} in {wall:.1f}s")
+    print(f"{'page':>14} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for page, stats in results["pages"].items():
+        print(f"{page:>14} {stats['count']:>5} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+              f"{stats['p99']:>8.1f} {stats['max']:>8.1f}")
+    if errors:
+        print(f"Errors: {errors}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Results written to {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
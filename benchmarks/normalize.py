@@ -0,0 +1,66 @@
+"""
+normalize.py
+Compare the original per-line headline cleaning with HeadlineNormalizer
+on synthetic headlines.
+
+    python -m benchmarks.normalize              # 1M headlines
+    python -m benchmarks.normalize --count 200000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from text_utils import STOP_WORDS, HeadlineNormalizer
+
+
+def synthetic_headlines(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ("minister storm market election court climate league crisis deal report "
+             "transport sporting lively live video podcast sport").split()
+    for _ in range(count):
+        headline = " ".join(rng.choice(words) for _ in range(rng.randint(5, 12)))
+        yield f"  {headline.capitalize()}{rng.choice(['', '!', '?', ' – analysis', ': what we know'])} "
+
+
+def legacy_clean(raw):
+    # The implementation clean_headlines shipped with, kept for comparison
+    cleaned = []
+    seen = set()
+    for line in raw:
+        line = line.strip()
+        line = line.translate(str.maketrans("", "", string.punctuation))
+        line = line.title()
+        if line and line not in seen:
+            if not any(sw in line.lower() for sw in STOP_WORDS):
+                cleaned.append(line)
+                seen.add(line)
+    return cleaned
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    raw = list(synthetic_headlines(args.count))
+    started = time.perf_counter()
+    legacy = legacy_clean(raw)
+    legacy_s = time.perf_counter() - started
+
+    normalizer = HeadlineNormalizer(batch_size=args.batch_size)
+    started = time.perf_counter()
+    kept = list(normalizer.iter_clean(raw))
+    new_s = time.perf_counter() - started
+
+    print(f"{args.count:,} headlines")
+    print(f"  legacy      {legacy_s:7.2f} s  kept {len(legacy):,}")
+    print(f"  normalizer  {new_s:7.2f} s  kept {len(kept):,}  ({legacy_s / new_s:.1f}x faster)")
+    # Whole-word matching keeps headlines like "Transport ..." that substring checks dropped
+    print(f"  rescued by word-boundary matching: {len(set(kept) - set(legacy)):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+ordering.py
+Rerun time of the CommanderGH.py ordering view against catalog size, next
+to the original one-number_input-per-product loop.
+
+    python -m benchmarks.ordering --sizes 100 250 500 --runs 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "CommanderGH.py")
+
+# The Login branch as it was: every product gets a widget and the cart is
+# rebuilt from all of them on each rerun.
+LEGACY_SCRIPT = """
+import streamlit as st
+from database import load_products
+from utils import calculate_cart_total
+
+products = load_products()
+cart = []
+st.subheader("Products")
+for p in products:
+    st.write(f"{p['name']} - ${p['price']} - Stock: {p['stock']}")
+    qty = st.number_input(f"Qty for {p['name']}", min_value=0, max_value=p['stock'], key=p['id'])
+    if qty > 0:
+        cart.append({"product": p, "quantity": qty})
+if cart:
+    st.write(f"**Total: ${calculate_cart_total(cart)}**")
+"""
+
+
+def grow_catalog(size: int) -> None:
+    from database import load_products, upsert_products
+
+    rng = random.Random(size)
+    start = max(p["id"] for p in load_products()) + 1
+    upsert_products([
+        {"id": i, "name": f"Product {i:06d}", "price": round(rng.uniform(1, 500), 2),
+         "category": rng.choice(["Electronics", "Home", "Garden", "Toys"]), "stock": rng.randint(0, 100)}
+        for i in range(start, size + 1)
+    ])
+
+
+def median_rerun(at, runs: int) -> float:
+    at.run()
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["COMMANDERGH_DB"] = os.path.join(tempfile.mkdtemp(), "ordering.db")
+    from streamlit.testing.v1 import AppTest
+
+    print(f"{'products':>9} {'legacy ms':>10} {'paged ms':>9}")
+    for size in sorted(args.sizes):
+        grow_catalog(size)
+        legacy = AppTest.from_string(LEGACY_SCRIPT, default_timeout=600)
+        paged = AppTest.from_file(APP, default_timeout=600)
+        paged.session_state.logged_in = True
+        paged.session_state.user_id = "bench"
+        paged.session_state.user_role = "customer"
+        paged.run()
+        paged.selectbox[0].select("Login")
+        print(f"{size:>9} {median_rerun(legacy, args.runs) * 1000:>10.1f} "
+              f"{median_rerun(paged, args.runs) * 1000:>9.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+reports.py
+Time the columnar product/category/daily reports over synthetic line items.
+
+    python -m benchmarks.reports --lines 2000000
+"""
+
+import argparse
+import time
+from datetime import date
+
+import numpy as np
+
+from analytics import LineItemStore
+
+
+def build_store(lines: int, products: int, categories: int, days: int, seed: int = 0) -> LineItemStore:
+    rng = np.random.default_rng(seed)
+    store = LineItemStore()
+    store.categories = [f"Category {i}" for i in range(categories)]
+    store.category_index = {c: i for i, c in enumerate(store.categories)}
+    store.product_ids = list(range(1, products + 1))
+    store.product_names = [f"Product {i}" for i in store.product_ids]
+    store.product_categories = list(rng.integers(0, categories, products))
+    store.product_index = {p: i for i, p in enumerate(store.product_ids)}
+
+    product = rng.integers(0, products, lines).astype(np.int32)
+    quantity = rng.integers(1, 5, lines).astype(np.int32)
+    price = np.round(rng.uniform(1, 500, products), 2)
+    store._reserve(lines)
+    store.columns["order_id"][:lines] = np.arange(lines) // 3 + 1
+    store.columns["day"][:lines] = np.sort(rng.integers(0, days, lines)) + 19000
+    store.columns["product"][:lines] = product
+    store.columns["category"][:lines] = np.array(store.product_categories, dtype=np.int16)[product]
+    store.columns["quantity"][:lines] = quantity
+    store.columns["revenue"][:lines] = price[product] * quantity
+    store.size = lines
+    return store
+
+
+def timed(label: str, fn, repeat: int = 5) -> None:
+    best = min(_elapsed(fn) for _ in range(repeat))
+    print(f"{label:>32}: {best * 1000:8.1f} ms")
+
+
+def _elapsed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--days", type=int, default=730)
+    args = parser.parse_args()
+
+    store = build_store(args.lines, args.products, args.categories, args.days)
+    first, last = store.date_bounds()
+    quarter_end = date.fromordinal(first.toordinal() + 90)
+    print(f"{args.lines:,} line items, {args.products:,} products, {first} .. {last}")
+    timed("product report, all time", lambda: store.product_report())
+    timed("product report, one quarter", lambda: store.product_report(first, quarter_end))
+    timed("product report, one category", lambda: store.product_report(category="Category 0"))
+    timed("category report, all time", lambda: store.category_report())
+    timed("daily report, all time", lambda: store.daily_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+search.py
+Query latency of the product search index over a large synthetic catalog,
+plus the cost of building it, of syncing a single product change, and of
+one filtered results page through search_products.
+
+    python -m benchmarks.search --products 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+BRANDS = "acme nova zenith orbit apex lumen vertex polar summit ember".split()
+ADJECTIVES = "wireless smart portable compact deluxe ergonomic stainless organic vintage premium".split()
+NOUNS = ("headphones speaker watch kettle blender lamp backpack jacket sneakers camera "
+         "keyboard monitor drone grill vacuum mattress tent bicycle guitar juicer").split()
+CATEGORIES = "Electronics Home Kitchen Fashion Outdoors Sports Music Garden".split()
+
+FILTERS = {
+    "category": {"category": "Kitchen"},
+    "price": {"min_price": 100.0, "max_price": 250.0},
+    "both": {"category": "Electronics", "min_price": 50.0, "max_price": 400.0},
+}
+
+QUERIES = {
+    "exact word": "headphones",
+    "two words": "wireless speaker",
+    "brand + noun": "acme kettle",
+    "as-you-type": "ergo",
+    "typo": "headphnes",
+    "typo + word": "portble camera",
+    "category": "kitchen blender",
+}
+
+
+def synthetic_catalog(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {"id": i, "name": f"{rng.choice(BRANDS).title()} {rng.choice(ADJECTIVES).title()} "
+                          f"{rng.choice(NOUNS).title()} {rng.choice('XYZ')}{rng.randint(100, 999)}",
+         "category": rng.choice(CATEGORIES), "price": round(rng.uniform(5, 900), 2), "stock": rng.randint(0, 90)}
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=12, help="results fetched per query (one page)")
+    args = parser.parse_args()
+
+    os.environ["COMMANDERGH_DB"] = os.path.join(tempfile.mkdtemp(), "search.db")
+    from database import upsert_products
+    from search import SearchIndex, get_search_index, search_products
+
+    products = synthetic_catalog(args.products)
+    started = time.perf_counter()
+    index = SearchIndex()
+    index.sync(1, products)
+    print(f"Indexed {args.products:,} products in {time.perf_counter() - started:.2f}s")
+
+    changed = [dict(p) for p in products]
+    changed[0]["name"] = "Acme Quantum Toaster Q100"
+    started = time.perf_counter()
+    index.sync(2, changed)
+    print(f"Synced one renamed product in {(time.perf_counter() - started) * 1000:.1f} ms "
+          f"(full pass over unchanged rows)")
+    started = time.perf_counter()
+    index.add(dict(changed[1], name="Nova Quantum Lamp Z200"))
+    print(f"Re-indexed one product directly in {(time.perf_counter() - started) * 1e6:.0f} µs\n")
+
+    print(f"{'query':>14} {'text':>18} {'matches':>8} {'median µs':>10} {'p99 µs':>8}")
+    for label, text in QUERIES.items():
+        total = len(index.search_ids(text, limit=args.products))
+        median, p99 = timed(lambda: index.search_ids(text, limit=args.limit), args.repeat)
+        print(f"{label:>14} {text!r:>18} {total:>8,} {median:>10.0f} {p99:>8.0f}")
+
+    # The products page path: shared index over the database catalog, one filtered page
+    upsert_products(products)
+    get_search_index()
+    print(f"\nsearch_products, first page of {args.limit}")
+    print(f"{'filter':>14} {'text':>18} {'matches':>8} {'median µs':>10} {'p99 µs':>8}")
+    for label, filters in FILTERS.items():
+        for text in ("headphones", "ergo"):
+            total = search_products(text, page_size=args.limit, **filters).total
+            median, p99 = timed(lambda: search_products(text, page_size=args.limit, **filters), args.repeat)
+            print(f"{label:>14} {text!r:>18} {total:>8,} {median:>10.0f} {p99:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+session_memory.py
+Bytes held per session by the cart: the old dict-per-line representation
+against the compact slotted lines.
+
+Placed orders are not measured: no session keeps them once checkout has
+written them to the ledger.
+
+    python -m benchmarks.session_memory --sessions 5000 --lines 5
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from cart import Cart
+
+CATEGORIES = ["Electronics", "Home", "Fashion", "Kitchen"]
+
+
+def synthetic_catalog(count: int):
+    return [{"id": i, "name": f"Product {i:06d}", "price": round(random.uniform(1, 500), 2),
+             "category": random.choice(CATEGORIES), "stock": 100, "image": "📦"} for i in range(1, count + 1)]
+
+
+def legacy_cart(products):
+    """The cart as the shop used to keep it: a copy of the product's fields per line."""
+    cart = {}
+    for product in products:
+        line = {field: product.get(field, "") for field in ("id", "name", "price", "category", "image")}
+        line["quantity"] = 1
+        cart[product["id"]] = line
+    return cart
+
+
+def compact_cart(products):
+    cart = Cart()
+    for product in products:
+        cart.add(product)
+    return cart
+
+
+def per_session_bytes(build, sessions: int, catalog, lines: int, rng: random.Random) -> float:
+    picks = [rng.sample(catalog, lines) for _ in range(sessions)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [build(products) for products in picks]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return total / sessions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=5, help="cart lines per session")
+    parser.add_argument("--products", type=int, default=2000, help="catalog size the lines are drawn from")
+    args = parser.parse_args()
+
+    random.seed(0)
+    catalog = synthetic_catalog(args.products)
+    print(f"{args.sessions:,} sessions with {args.lines} cart lines each\n")
+    print(f"{'representation':>16} {'cart bytes':>11}")
+    results = {}
+    for label, build in (("dict lines", legacy_cart), ("slotted lines", compact_cart)):
+        results[label] = per_session_bytes(build, args.sessions, catalog, args.lines, random.Random(1))
+        print(f"{label:>16} {results[label]:>11,.0f}")
+    print(f"\nPer-session cart memory down {1 - results['slotted lines'] / results['dict lines']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
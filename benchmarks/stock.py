@@ -0,0 +1,95 @@
+"""
+stock.py
+Cost of the low-stock view: the old full-catalog DataFrame filter against the
+stock monitor's incremental refresh and top-k read.
+
+    python -m benchmarks.stock --products 20000 --orders 50000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+def seed(products: int, orders: int, rng: random.Random) -> None:
+    """A catalog with varied stock and a month of orders against it."""
+    from database import append_order, load_products, upsert_products
+
+    upsert_products([
+        {"id": i, "name": f"Product {i:06d}", "price": round(rng.uniform(1, 500), 2),
+         "category": rng.choice(["Electronics", "Home", "Fashion", "Kitchen"]), "stock": rng.randint(0, 400)}
+        for i in range(1, products + 1)
+    ])
+    catalog = load_products()
+    now = datetime.now()
+    new_orders = []
+    for _ in range(orders):
+        items = [dict(p, quantity=rng.randint(1, 3)) for p in rng.sample(catalog, rng.randint(1, 4))]
+        new_orders.append({
+            "user_id": "customer", "items": items, "total": sum(i["price"] * i["quantity"] for i in items),
+            "order_date": (now - timedelta(minutes=rng.randint(0, 30 * 24 * 60))).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        list(pool.map(append_order, new_orders))
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--orders", type=int, default=50_000)
+    parser.add_argument("--top", type=int, default=10, help="at-risk products shown")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["COMMANDERGH_DB"] = os.path.join(tempfile.mkdtemp(), "stock.db")
+    import pandas as pd
+    from database import append_order, get_product, load_products
+    from stock_monitor import StockMonitor
+
+    rng = random.Random(0)
+    started = time.perf_counter()
+    seed(args.products, args.orders, rng)
+    print(f"Seeded {args.products:,} products and {args.orders:,} orders in {time.perf_counter() - started:.1f}s")
+
+    def full_scan():
+        products_df = pd.DataFrame(load_products())
+        return products_df[products_df["stock"] < 10]
+
+    monitor = StockMonitor()
+    started = time.perf_counter()
+    monitor.refresh()
+    print(f"Monitor built in {(time.perf_counter() - started) * 1000:.0f} ms "
+          f"({monitor.below_reorder_point():,} products at or below their reorder point)\n")
+
+    def order_and_refresh():
+        product = get_product(rng.choice([p["id"] for p in load_products() if p["stock"] > 0]))
+        append_order({"user_id": "customer", "items": [dict(product, quantity=1)], "total": product["price"],
+                      "take_stock": True,
+                      "order_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        started = time.perf_counter()
+        monitor.refresh()
+        return (time.perf_counter() - started) * 1000
+
+    refresh_ms = statistics.median(order_and_refresh() for _ in range(args.repeat))
+    print(f"{'operation':>34} {'median ms':>10}")
+    print(f"{'DataFrame filter stock < 10':>34} {timed(full_scan, args.repeat):>10.2f}")
+    print(f"{'monitor refresh after one order':>34} {refresh_ms:>10.2f}")
+    print(f"{f'monitor top {args.top} at risk':>34} {timed(lambda: monitor.at_risk(args.top), args.repeat):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
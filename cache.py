@@ -0,0 +1,63 @@
+"""
+cache.py
+Keyed LRU memoization invalidated by data versions.
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class VersionedLRU:
+    """Thread-safe LRU of computed values, each tagged with the data version it was built from.
+
+    A lookup whose version differs from the stored one recomputes and
+    replaces the entry, so stale results are never served and nothing has
+    to be invalidated explicitly.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable, compute: Callable[[], object]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Computed outside the lock; concurrent misses may both compute, last one wins
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def memoize(version: Callable[[], Hashable], maxsize: int = 32):
+    """Cache a function's results per argument tuple until ``version()`` changes.
+
+    Results are shared between callers (and Streamlit sessions), so treat
+    returned DataFrames and figures as read-only.
+    """
+    def decorator(fn):
+        cache = VersionedLRU(maxsize)
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            return cache.get(args, version(), lambda: fn(*args))
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
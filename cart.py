@@ -0,0 +1,192 @@
+"""
+cart.py
+Shopping cart keyed by product id with a running subtotal, and the compact
+order record a checkout turns it into.
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from catalog import get_catalog_index
+
+SHIPPING_FIELDS = ("name", "address", "city", "state", "zip_code")
+ORDER_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+def _describe(by_id: Dict[int, Dict], product_id: int, quantity: int, price_cents: int) -> Dict:
+    """A cart or order line as a dict, with its name, category and image read from ``by_id``."""
+    product = by_id.get(product_id)
+    return {
+        "id": product_id,
+        "name": product["name"] if product else f"Product #{product_id}",
+        "price": price_cents / 100,
+        "category": product["category"] if product else "",
+        "image": product.get("image", "") if product else "",
+        "quantity": quantity,
+    }
+
+
+class CartLine:
+    """One cart line: the product it refers to, how many, and the price it was added at."""
+
+    __slots__ = ("product_id", "quantity", "price_cents")
+
+    def __init__(self, product_id: int, quantity: int, price_cents: int):
+        self.product_id = product_id
+        self.quantity = quantity
+        self.price_cents = price_cents
+
+
+class Cart:
+    """Cart lines keyed by product id, in the order they were first added.
+
+    Lines hold only the product id, quantity and a price snapshot in cents;
+    names and images are looked up in the shared catalog when the cart is
+    displayed, so a session's cart costs a few dozen bytes per line. The
+    subtotal is kept in integer cents and adjusted on every change, so
+    reading it never walks the lines and never accumulates float error.
+    """
+
+    __slots__ = ("_lines", "_subtotal_cents")
+
+    def __init__(self):
+        self._lines: Dict[int, CartLine] = {}
+        self._subtotal_cents = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __bool__(self) -> bool:
+        return bool(self._lines)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.items())
+
+    def __contains__(self, product_id: int) -> bool:
+        return product_id in self._lines
+
+    @property
+    def subtotal(self) -> float:
+        return self._subtotal_cents / 100
+
+    def quantity(self, product_id: int) -> int:
+        line = self._lines.get(product_id)
+        return line.quantity if line else 0
+
+    def quantities(self) -> Dict[int, int]:
+        return {product_id: line.quantity for product_id, line in self._lines.items()}
+
+    def items(self) -> List[Dict]:
+        """Return the lines as dicts with their catalog details, e.g. to display or store with an order."""
+        by_id = get_catalog_index().by_id
+        return [_describe(by_id, line.product_id, line.quantity, line.price_cents)
+                for line in self._lines.values()]
+
+    def add(self, product: Dict, quantity: int = 1) -> None:
+        line = self._lines.get(product["id"])
+        if line is None:
+            line = self._lines[product["id"]] = CartLine(product["id"], 0, _cents(product["price"]))
+        self._set(line, line.quantity + quantity)
+
+    def set_quantity(self, product_id: int, quantity: int) -> None:
+        """Change a line's quantity; zero or less removes the line."""
+        line = self._lines.get(product_id)
+        if line is not None:
+            self._set(line, quantity)
+
+    def remove(self, product_id: int) -> None:
+        self.set_quantity(product_id, 0)
+
+    def apply_quantities(self, quantities: Dict[int, int]) -> List[int]:
+        """Apply many quantity edits at once; returns the ids whose quantity changed."""
+        changed = [pid for pid, qty in quantities.items()
+                   if pid in self._lines and self._lines[pid].quantity != qty]
+        for product_id in changed:
+            self.set_quantity(product_id, quantities[product_id])
+        return changed
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self._subtotal_cents = 0
+
+    def reprice(self, lookup: Callable[[int], Optional[Dict]]) -> List[Tuple[Dict, Optional[float]]]:
+        """Re-snapshot prices from the catalog before checkout.
+
+        Returns ``(line, new_price)`` for each line whose price changed, with
+        ``new_price`` of None for products no longer sold (those lines are removed).
+        """
+        changes = []
+        by_id = get_catalog_index().by_id
+        for product_id, line in list(self._lines.items()):
+            product = lookup(product_id)
+            if product is None:
+                changes.append((_describe(by_id, product_id, line.quantity, line.price_cents), None))
+                self.remove(product_id)
+            elif _cents(product["price"]) != line.price_cents:
+                changes.append((_describe(by_id, product_id, line.quantity, line.price_cents), product["price"]))
+                self._subtotal_cents += (_cents(product["price"]) - line.price_cents) * line.quantity
+                line.price_cents = _cents(product["price"])
+        return changes
+
+    def to_order(self, user_id: str, shipping_info: Optional[Dict] = None, payment_method: str = "",
+                 placed_at: Optional[int] = None) -> "OrderRecord":
+        """Snapshot the cart as an order placed now (or at ``placed_at``, in Unix seconds)."""
+        return OrderRecord(
+            user_id,
+            tuple((line.product_id, line.quantity, line.price_cents) for line in self._lines.values()),
+            self._subtotal_cents,
+            tuple((shipping_info or {}).get(field, "") for field in SHIPPING_FIELDS),
+            payment_method,
+            int(time.time()) if placed_at is None else placed_at,
+        )
+
+    def _set(self, line: CartLine, quantity: int) -> None:
+        quantity = max(0, int(quantity))
+        self._subtotal_cents += line.price_cents * (quantity - line.quantity)
+        if quantity == 0:
+            del self._lines[line.product_id]
+        else:
+            line.quantity = quantity
+
+
+class OrderRecord:
+    """An order as flat fields: ``(product_id, quantity, price_cents)`` lines, totals in cents
+    and an integer Unix timestamp. ``as_dict`` expands it into the ledger's order dict."""
+
+    __slots__ = ("user_id", "lines", "total_cents", "shipping", "payment_method", "placed_at", "status")
+
+    def __init__(self, user_id: str, lines: Tuple[Tuple[int, int, int], ...], total_cents: int,
+                 shipping: Tuple[str, ...] = (), payment_method: str = "", placed_at: int = 0,
+                 status: str = "Processing"):
+        self.user_id = user_id
+        self.lines = lines
+        self.total_cents = total_cents
+        self.shipping = shipping
+        self.payment_method = payment_method
+        self.placed_at = placed_at
+        self.status = status
+
+    @property
+    def total(self) -> float:
+        return self.total_cents / 100
+
+    @property
+    def order_date(self) -> str:
+        return datetime.fromtimestamp(self.placed_at).strftime(ORDER_DATE_FORMAT)
+
+    def as_dict(self) -> Dict:
+        by_id = get_catalog_index().by_id
+        return {
+            "user_id": self.user_id,
+            "items": [_describe(by_id, *line) for line in self.lines],
+            "total": self.total,
+            "shipping_info": dict(zip(SHIPPING_FIELDS, self.shipping)),
+            "payment_method": self.payment_method,
+            "order_date": self.order_date,
+            "status": self.status,
+        }
@@ -0,0 +1,109 @@
+"""
+catalog.py
+Filtered, sorted and paginated product queries over precomputed indexes.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, NamedTuple, Optional
+
+from database import load_products, sync_catalog
+
+ALL_CATEGORIES = "All"
+SORT_OPTIONS = {
+    "Price: Low to High": "price_asc",
+    "Price: High to Low": "price_desc",
+    "Name": "name",
+}
+PAGE_SIZE = 12
+
+
+class Page(NamedTuple):
+    items: List[Dict]
+    page: int
+    pages: int
+    total: int
+
+
+class _SortedIndex:
+    """Products of one category kept in price order and in name order."""
+
+    def __init__(self, products: List[Dict]):
+        self.by_price = sorted(products, key=lambda p: (p["price"], p["id"]))
+        self.prices = [p["price"] for p in self.by_price]
+        self.by_name = sorted(products, key=lambda p: (p["name"].lower(), p["id"]))
+
+
+class CatalogIndex:
+    """Per-category sorted indexes for one catalog version."""
+
+    def __init__(self, version: int, products: List[Dict]):
+        self.version = version
+        groups: Dict[str, List[Dict]] = {ALL_CATEGORIES: products}
+        for p in products:
+            groups.setdefault(p["category"], []).append(p)
+        self.categories = sorted(c for c in groups if c != ALL_CATEGORIES)
+        self.indexes = {c: _SortedIndex(items) for c, items in groups.items()}
+        prices = self.indexes[ALL_CATEGORIES].prices
+        self.min_price = prices[0] if prices else 0.0
+        self.max_price = prices[-1] if prices else 0.0
+        self.by_id = {p["id"]: p for p in products}
+
+    def query(self, category: str = ALL_CATEGORIES, sort: str = "price_asc",
+              min_price: Optional[float] = None, max_price: Optional[float] = None,
+              page: int = 1, page_size: int = PAGE_SIZE) -> Page:
+        """Return one page of products; price sorts cost O(log n + page_size)."""
+        index = self.indexes.get(category)
+        if index is None:
+            return Page([], 1, 1, 0)
+        lo = 0 if min_price is None else bisect_left(index.prices, min_price)
+        hi = len(index.prices) if max_price is None else bisect_right(index.prices, max_price)
+        hi = max(lo, hi)
+
+        if sort == "name":
+            if lo == 0 and hi == len(index.prices):
+                matches = index.by_name
+            else:
+                # Price bounds cut across name order, so this path scans the category.
+                matches = [p for p in index.by_name
+                           if (min_price is None or p["price"] >= min_price)
+                           and (max_price is None or p["price"] <= max_price)]
+            total = len(matches)
+            page, pages, start = clamp_page(page, page_size, total)
+            return Page(matches[start:start + page_size], page, pages, total)
+
+        total = hi - lo
+        page, pages, start = clamp_page(page, page_size, total)
+        if sort == "price_desc":
+            stop = hi - start
+            items = index.by_price[max(lo, stop - page_size):stop][::-1]
+        else:
+            items = index.by_price[lo + start:min(hi, lo + start + page_size)]
+        return Page(items, page, pages, total)
+
+
+def clamp_page(page: int, page_size: int, total: int):
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+    return page, pages, (page - 1) * page_size
+
+
+_index: Optional[CatalogIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_catalog_index() -> CatalogIndex:
+    """Return the index for the current catalog version, rebuilding it after product changes.
+
+    Stock sold by checkouts does not change the version; it is patched into
+    the shared product dicts the index holds.
+    """
+    global _index
+    version = sync_catalog()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = CatalogIndex(version, load_products())
+        return _index
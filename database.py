@@ -0,0 +1,739 @@
+"""
+database.py
+SQLite storage for the CommanderGH shop, with a process-wide product cache.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DB_PATH = os.environ.get("COMMANDERGH_DB", "commandergh.db")
+
+# Seed catalog written on first start
+SAMPLE_PRODUCTS = [
+    {"id": 1, "name": "Wireless Headphones", "price": 100.00, "category": "Electronics", "stock": 50, "image": "🎧"},
+    {"id": 2, "name": "Smartphone", "price": 1500.00, "category": "Electronics", "stock": 30, "image": "📱"},
+    {"id": 3, "name": "Running Shoes", "price": 150.00, "category": "Fashion", "stock": 100, "image": "👟"},
+    {"id": 4, "name": "Shirts Unisex", "price": 49.00, "category": "Fashion", "stock": 40, "image": "👕"},
+    {"id": 5, "name": "Water Bottle", "price": 30.00, "category": "Home", "stock": 200, "image": "💧"},
+    {"id": 6, "name": "Ladies pouches", "price": 50.00, "category": "Fashion", "stock": 75, "image": "🎒"},
+    {"id": 7, "name": "Fitness Tracker", "price": 90.00, "category": "Electronics", "stock": 60, "image": "⌚"},
+    {"id": 8, "name": "Juice Extractor", "price": 470.00, "category": "Home", "stock": 45, "image": "🍹"}
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    id       INTEGER PRIMARY KEY,
+    name     TEXT    NOT NULL,
+    price    REAL    NOT NULL,
+    category TEXT    NOT NULL,
+    stock    INTEGER NOT NULL,
+    image    TEXT    NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category);
+-- Products whose stock a checkout took, so caches patch those rows instead of reloading the catalog
+CREATE TABLE IF NOT EXISTS stock_changes (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    username   TEXT PRIMARY KEY,
+    password   TEXT NOT NULL,
+    email      TEXT NOT NULL DEFAULT '',
+    role       TEXT NOT NULL DEFAULT 'customer',
+    created_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email) WHERE email <> '';
+CREATE TABLE IF NOT EXISTS orders (
+    order_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id        TEXT    NOT NULL,
+    total          REAL    NOT NULL,
+    shipping_info  TEXT    NOT NULL DEFAULT '{}',
+    payment_method TEXT    NOT NULL DEFAULT '',
+    order_date     TEXT    NOT NULL,
+    status         TEXT    NOT NULL DEFAULT 'Processing'
+);
+-- A user's order history newest first, covering the header columns so a page never reads the table
+DROP INDEX IF EXISTS idx_orders_user;
+CREATE INDEX IF NOT EXISTS idx_orders_user_recent ON orders (user_id, order_id DESC, order_date, total, status);
+CREATE INDEX IF NOT EXISTS idx_orders_date ON orders (order_date);
+CREATE TABLE IF NOT EXISTS order_items (
+    order_id   INTEGER NOT NULL REFERENCES orders (order_id),
+    line_no    INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    name       TEXT    NOT NULL,
+    category   TEXT    NOT NULL DEFAULT '',
+    image      TEXT    NOT NULL DEFAULT '',
+    price      REAL    NOT NULL,
+    quantity   INTEGER NOT NULL,
+    PRIMARY KEY (order_id, line_no)
+);
+CREATE TABLE IF NOT EXISTS sales_totals (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    orders  INTEGER NOT NULL,
+    revenue REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day     TEXT PRIMARY KEY,
+    orders  INTEGER NOT NULL,
+    revenue REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sales_hourly (
+    hour    TEXT PRIMARY KEY,                -- 'YYYY-MM-DD HH'
+    orders  INTEGER NOT NULL,
+    revenue REAL    NOT NULL
+);
+-- Product and category reports are aggregated from analytics.LineItemStore instead
+DROP TABLE IF EXISTS sales_by_product;
+DROP TABLE IF EXISTS sales_by_category;
+"""
+
+PRODUCT_COLUMNS = ("id", "name", "price", "category", "stock", "image")
+
+
+class DatabaseError(RuntimeError):
+    """Raised when the storage layer fails."""
+
+
+class DuplicateUserError(DatabaseError):
+    """Raised when a username or email is already registered."""
+
+
+class OutOfStockError(DatabaseError):
+    """Raised when a stock decrement would take a product below zero."""
+
+    def __init__(self, product_id: int, message: str):
+        super().__init__(message)
+        self.product_id = product_id
+
+
+# ── Connections ------------------------------------------------------------
+POOL_SIZE = 8          # connections per database file, shared by every thread
+POOL_TIMEOUT = 30.0    # seconds to wait for a free connection
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    """Open a connection to ``path``, creating and migrating the database on first use."""
+    try:
+        # Statements are prepared once per connection and reused from its cache
+        conn = sqlite3.connect(path, timeout=30, cached_statements=256, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    except sqlite3.Error as exc:
+        raise DatabaseError(f"Cannot open database {path}: {exc}") from exc
+    with _init_lock:
+        if path not in _initialized:
+            init_db(conn)
+            _initialized.add(path)
+    return conn
+
+
+class _ConnectionPool:
+    """Long-lived connections to one database file, lent to one thread at a time.
+
+    Streamlit runs every rerun on a fresh thread, so connections are not tied
+    to threads: they stay open for the life of the process with their
+    pragmas applied and their statement caches warm. At most ``size`` are
+    opened; a borrower waits for a free one beyond that.
+    """
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self.opened = 0
+        self.idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            grow = self.opened < self.size
+            if grow:
+                self.opened += 1
+        if grow:
+            try:
+                return _open_connection(self.path)
+            except Exception:
+                with self.lock:
+                    self.opened -= 1
+                raise
+        try:
+            return self.idle.get(timeout=POOL_TIMEOUT)
+        except queue.Empty:
+            raise DatabaseError(f"No free connection to {self.path} after {POOL_TIMEOUT:.0f}s") from None
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self.idle.put(conn)
+
+
+_pools: Dict[str, _ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection for the block and hand it back afterwards.
+
+    Finish with the connection inside the block, and do not borrow a second
+    one from within it: a thread holding one while waiting for another could
+    starve the pool.
+    """
+    pool = _pools.get(DB_PATH)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(DB_PATH, _ConnectionPool(DB_PATH))
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+def init_db(conn: sqlite3.Connection) -> None:
+    """Create the schema and seed the sample catalog into an empty database."""
+    with conn:
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('catalog_version', 0)")
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('stock_adjustments', 0)")
+        if conn.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 0:
+            conn.executemany(
+                "INSERT INTO products (id, name, price, category, stock, image) "
+                "VALUES (:id, :name, :price, :category, :stock, :image)",
+                SAMPLE_PRODUCTS,
+            )
+            _bump_catalog_version(conn)
+        if (conn.execute("SELECT COUNT(*) FROM sales_totals").fetchone()[0] == 0
+                or conn.execute("SELECT NOT EXISTS (SELECT 1 FROM sales_hourly) "
+                                "AND EXISTS (SELECT 1 FROM orders)").fetchone()[0]):
+            rebuild_sales_rollups(conn)
+
+
+# ── Product catalog ---------------------------------------------------------
+class _CatalogCache:
+    """Process-wide snapshot of the products table, keyed by catalog version."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.products: List[Dict] = []
+        self.by_id: Dict[int, Dict] = {}
+        self.by_category: Dict[str, List[Dict]] = {}
+        self.stock_seq = 0          # last stock_changes row applied
+
+
+_catalog = _CatalogCache()
+
+STOCK_LOG_KEEP = 100_000   # stock_changes rows kept; a cache further behind re-reads all stock
+
+
+def _bump_catalog_version(conn: sqlite3.Connection) -> None:
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalog_version'")
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'stock_adjustments'")
+
+
+def catalog_version() -> int:
+    """Return the current catalog version.
+
+    It changes whenever a product is added or edited outside a checkout.
+    Stock taken by checkouts only moves the second half of ``inventory_version``.
+    """
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = 'catalog_version'"
+        ).fetchone()
+    return row[0]
+
+
+def inventory_version() -> tuple:
+    """Changes whenever any product field, stock taken by checkouts included, changes."""
+    with connection() as conn:
+        return tuple(conn.execute(
+            "SELECT (SELECT value FROM meta WHERE key = 'catalog_version'), "
+            "(SELECT COALESCE(MAX(seq), 0) FROM stock_changes)"
+        ).fetchone())
+
+
+def stock_adjustments() -> int:
+    """Count of product changes other than checkouts; stock taken by orders does not move it."""
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = 'stock_adjustments'"
+        ).fetchone()
+    return row[0]
+
+
+def _refresh_catalog() -> _CatalogCache:
+    # One small version read per call. The full table is only reloaded when
+    # a product was added or edited; checkouts since the last call only patch
+    # the stock of the products they sold, in the shared dicts.
+    version, stock_seq = inventory_version()
+    if _catalog.version == version and _catalog.stock_seq == stock_seq:
+        return _catalog
+    with _catalog.lock, connection() as conn:
+        if _catalog.version != version:
+            rows = conn.execute(
+                "SELECT id, name, price, category, stock, image FROM products ORDER BY id"
+            ).fetchall()
+            products = [dict(row) for row in rows]
+            by_category: Dict[str, List[Dict]] = {}
+            for p in products:
+                by_category.setdefault(p["category"], []).append(p)
+            _catalog.products = products
+            _catalog.by_id = {p["id"]: p for p in products}
+            _catalog.by_category = by_category
+            _catalog.version = version
+        elif _catalog.stock_seq < stock_seq:
+            oldest = conn.execute("SELECT MIN(seq) FROM stock_changes").fetchone()[0]
+            if oldest is not None and oldest <= _catalog.stock_seq + 1:
+                rows = conn.execute(
+                    "SELECT id, stock FROM products WHERE id IN "
+                    "(SELECT product_id FROM stock_changes WHERE seq > ?)", (_catalog.stock_seq,)
+                )
+            else:   # the log was pruned past us
+                rows = conn.execute("SELECT id, stock FROM products")
+            for product_id, stock in rows:
+                product = _catalog.by_id.get(product_id)
+                if product is not None:
+                    product["stock"] = stock
+        _catalog.stock_seq = max(_catalog.stock_seq, stock_seq)
+    return _catalog
+
+
+def sync_catalog() -> int:
+    """Bring the shared product dicts up to date and return the catalog version."""
+    return _refresh_catalog().version
+
+
+def load_products() -> List[Dict]:
+    """Return every product. The dicts are shared by all sessions; treat them as read-only."""
+    return list(_refresh_catalog().products)
+
+
+def get_product(product_id: int) -> Optional[Dict]:
+    return _refresh_catalog().by_id.get(product_id)
+
+
+def upsert_products(products: List[Dict]) -> None:
+    """Insert or replace product rows in one transaction."""
+    with connection() as conn:
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO products (id, name, price, category, stock, image) "
+                    "VALUES (:id, :name, :price, :category, :stock, :image)",
+                    [{"image": "", **p} for p in products],
+                )
+                _bump_catalog_version(conn)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Cannot save products: {exc}") from exc
+
+
+def update_product(product_id: int, price: Optional[float] = None, stock: Optional[int] = None) -> None:
+    """Change a product's price and/or stock and invalidate every cached catalog."""
+    fields = {k: v for k, v in (("price", price), ("stock", stock)) if v is not None}
+    if not fields:
+        return
+    assignments = ", ".join(f"{k} = :{k}" for k in fields)
+    with connection() as conn:
+        try:
+            with conn:
+                cur = conn.execute(
+                    f"UPDATE products SET {assignments} WHERE id = :id", {**fields, "id": product_id}
+                )
+                if cur.rowcount == 0:
+                    raise DatabaseError(f"Unknown product id {product_id}")
+                _bump_catalog_version(conn)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Cannot update product {product_id}: {exc}") from exc
+
+
+def _take_stock(conn: sqlite3.Connection, lines: Dict[int, int]) -> None:
+    for product_id, quantity in sorted(lines.items()):
+        cur = conn.execute(
+            "UPDATE products SET stock = stock - ? WHERE id = ? AND stock >= ?",
+            (quantity, product_id, quantity),
+        )
+        if cur.rowcount == 0:
+            raise OutOfStockError(product_id, f"Not enough stock for product {product_id}")
+    # Logged instead of bumping catalog_version, so caches patch stock rather than rebuild
+    conn.executemany("INSERT INTO stock_changes (product_id) VALUES (?)", [(pid,) for pid in lines])
+    last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    if last % 1000 < len(lines):   # prune about once per thousand changes
+        conn.execute("DELETE FROM stock_changes WHERE seq <= ?", (last - STOCK_LOG_KEEP,))
+
+
+def decrement_stock(lines: Dict[int, int]) -> None:
+    """Take ``{product_id: quantity}`` out of stock atomically: every line or none."""
+    with connection() as conn:
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                _take_stock(conn, lines)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Cannot update stock: {exc}") from exc
+
+
+def increment_stock(lines: Dict[int, int]) -> None:
+    """Put ``{product_id: quantity}`` back into stock, e.g. after a failed order."""
+    with connection() as conn:
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE products SET stock = stock + ? WHERE id = ?",
+                    [(quantity, product_id) for product_id, quantity in lines.items()],
+                )
+                _bump_catalog_version(conn)
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Cannot update stock: {exc}") from exc
+
+
+def read_stock(product_id: int) -> Optional[int]:
+    """Read one product's stock straight from the table, bypassing the catalog cache."""
+    with connection() as conn:
+        row = conn.execute("SELECT stock FROM products WHERE id = ?", (product_id,)).fetchone()
+    return row[0] if row else None
+
+
+def read_stocks(product_ids: List[int]) -> Dict[int, int]:
+    """Read several products' stock straight from the table, as ``{product_id: stock}``."""
+    if not product_ids:
+        return {}
+    ids = ",".join(str(int(i)) for i in product_ids)
+    with connection() as conn:
+        rows = conn.execute(f"SELECT id, stock FROM products WHERE id IN ({ids})")
+        return {row[0]: row[1] for row in rows}
+
+# ── Users ----------------------------------------------------------------
+USER_COLUMNS = "username, password, email, role, created_at"
+
+
+def get_user(username: str) -> Optional[Dict]:
+    with connection() as conn:
+        row = conn.execute(
+            f"SELECT {USER_COLUMNS} FROM users WHERE username = ?", (username,)
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def get_user_by_email(email: str) -> Optional[Dict]:
+    if not email:
+        return None
+    with connection() as conn:
+        row = conn.execute(
+            f"SELECT {USER_COLUMNS} FROM users WHERE email = ?", (email,)
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def create_user(username: str, password_hash: str, email: str, role: str, created_at: str) -> None:
+    """Insert a user; raises DuplicateUserError if the username or email is taken."""
+    with connection() as conn:
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO users ({USER_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                    (username, password_hash, email, role, created_at),
+                )
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateUserError(f"User {username!r} or email {email!r} already exists") from exc
+        except sqlite3.Error as exc:
+            raise DatabaseError(f"Cannot save user {username!r}: {exc}") from exc
+
+
+def count_users() -> int:
+    with connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+def list_users() -> List[Dict]:
+    """Return users without their password hashes."""
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT username, email, role, created_at FROM users ORDER BY created_at, username"
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+# ── Order ledger -----------------------------------------------------------
+# Orders are only ever appended. Ids come from SQLite's AUTOINCREMENT inside
+# the inserting transaction, so they are unique across sessions and worker
+# processes. A single writer thread per process groups concurrent checkouts
+# into one fsync'd transaction.
+ORDER_BATCH_SIZE = 64
+ORDER_BATCH_WINDOW = 0.002   # seconds to wait for more orders to join a batch
+ORDERS_PAGE_SIZE = 10
+ORDER_COLUMNS = "order_id, user_id, total, shipping_info, payment_method, order_date, status"
+
+
+class _OrderWriter:
+    """Background group-commit writer for the order ledger."""
+
+    def __init__(self):
+        self.queue: "queue.Queue[tuple]" = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, order: Dict) -> Future:
+        future: Future = Future()
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+                self.thread.start()
+        self.queue.put((order, future))
+        return future
+
+    def _run(self) -> None:
+        # A connection of its own, outside the pool, committing with full fsyncs
+        conn = _open_connection(DB_PATH)
+        conn.execute("PRAGMA synchronous=FULL")
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < ORDER_BATCH_SIZE:
+                    batch.append(self.queue.get(timeout=ORDER_BATCH_WINDOW))
+            except queue.Empty:
+                pass
+            try:
+                with conn:
+                    ids = [_insert_order(conn, order) for order, _ in batch]
+            except Exception:
+                # Commit one by one so a single bad order cannot fail its neighbours
+                for order, future in batch:
+                    try:
+                        with conn:
+                            future.set_result(_insert_order(conn, order))
+                    except DatabaseError as exc:
+                        future.set_exception(exc)
+                    except Exception as exc:
+                        future.set_exception(DatabaseError(f"Cannot save order: {exc}"))
+            else:
+                for (_, future), order_id in zip(batch, ids):
+                    future.set_result(order_id)
+
+
+def _insert_order(conn: sqlite3.Connection, order: Dict) -> int:
+    if order.get("take_stock"):
+        lines: Dict[int, int] = {}
+        for item in order["items"]:
+            lines[item["id"]] = lines.get(item["id"], 0) + item["quantity"]
+        _take_stock(conn, lines)
+    cur = conn.execute(
+        "INSERT INTO orders (user_id, total, shipping_info, payment_method, order_date, status) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (order["user_id"], order["total"], json.dumps(order.get("shipping_info", {})),
+         order.get("payment_method", ""), order["order_date"], order.get("status", "Processing")),
+    )
+    order_id = cur.lastrowid
+    conn.executemany(
+        "INSERT INTO order_items (order_id, line_no, product_id, name, category, image, price, quantity) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(order_id, line_no, item["id"], item["name"], item.get("category", ""),
+          item.get("image", ""), item["price"], item["quantity"])
+         for line_no, item in enumerate(order["items"])],
+    )
+    _add_to_sales_rollups(conn, order)
+    return order_id
+
+
+_order_writer = _OrderWriter()
+
+
+def append_order(order: Dict, timeout: float = 30.0) -> int:
+    """Durably append an order and return its newly allocated order_id."""
+    return _order_writer.submit(order).result(timeout=timeout)
+
+
+def save_order(username: str, cart: List[Dict], total: Optional[float] = None,
+               shipping_info: Optional[Dict] = None, payment_method: str = "",
+               timeout: float = 30.0) -> int:
+    """Place an order for a ``[{"product": ..., "quantity": n}]`` cart and return its id.
+
+    The stock is taken in the same transaction that appends the order, and
+    the order joins the writer's next group commit. If any line can no longer
+    be filled, OutOfStockError is raised and nothing is saved.
+    """
+    items = [
+        {"id": line["product"]["id"], "name": line["product"]["name"], "price": line["product"]["price"],
+         "category": line["product"].get("category", ""), "image": line["product"].get("image", ""),
+         "quantity": int(line["quantity"])}
+        for line in cart if int(line["quantity"]) > 0
+    ]
+    if not items:
+        raise DatabaseError("Cannot save an empty order")
+    if total is None:
+        total = sum(int(round(item["price"] * 100)) * item["quantity"] for item in items) / 100
+    return append_order({
+        "user_id": username,
+        "items": items,
+        "total": total,
+        "shipping_info": shipping_info or {},
+        "payment_method": payment_method,
+        "order_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "status": "Processing",
+        "take_stock": True,
+    }, timeout)
+
+
+def _fetch_orders(where: str = "", params: tuple = (), order_by: str = "order_id",
+                  limit: Optional[int] = None) -> List[Dict]:
+    with connection() as conn:
+        sql = f"SELECT {ORDER_COLUMNS} FROM orders {where} ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        orders = []
+        for row in conn.execute(sql, params).fetchall():
+            order = dict(row)
+            order["shipping_info"] = json.loads(order["shipping_info"])
+            order["items"] = []
+            orders.append(order)
+        if not orders:
+            return orders
+        by_id = {o["order_id"]: o for o in orders}
+        ids = ",".join(str(i) for i in by_id)
+        for row in conn.execute(
+            "SELECT order_id, product_id, name, category, image, price, quantity FROM order_items "
+            f"WHERE order_id IN ({ids}) ORDER BY order_id, line_no"
+        ):
+            item = dict(row)
+            item["id"] = item.pop("product_id")
+            by_id[item.pop("order_id")]["items"].append(item)
+        return orders
+
+
+def user_order_page(user_id: str, before: Optional[int] = None,
+                    limit: int = ORDERS_PAGE_SIZE) -> Tuple[List[Dict], Optional[int]]:
+    """One page of a user's order headers, newest first, and the cursor of the next (older) page.
+
+    Pages are keyed on the last order id seen rather than an offset, so
+    each one is a single seek into the per-user index however deep the
+    history goes. Headers carry no items or shipping details; fetch those
+    with ``order_detail`` when an order is opened.
+    """
+    sql = "SELECT order_id, order_date, total, status FROM orders WHERE user_id = ?"
+    params: tuple = (user_id,)
+    if before is not None:
+        sql += " AND order_id < ?"
+        params += (before,)
+    sql += " ORDER BY order_id DESC LIMIT ?"
+    with connection() as conn:
+        rows = conn.execute(sql, params + (limit + 1,)).fetchall()
+    orders = [dict(row) for row in rows[:limit]]
+    return orders, (orders[-1]["order_id"] if len(rows) > limit else None)
+
+
+def count_user_orders(user_id: str) -> int:
+    with connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM orders WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+
+def order_detail(order_id: int, user_id: str) -> Optional[Dict]:
+    """Return one of a user's orders with its items and shipping details."""
+    orders = _fetch_orders("WHERE order_id = ? AND user_id = ?", (order_id, user_id))
+    return orders[0] if orders else None
+
+
+def recent_orders(limit: int = 5) -> List[Dict]:
+    """Return the newest orders, newest first."""
+    return _fetch_orders(order_by="order_id DESC", limit=limit)
+
+
+# ── Sales rollups ----------------------------------------------------------
+# Materialised in the same transaction that appends each order, so the
+# dashboards read precomputed rows instead of scanning the ledger.
+def _add_to_sales_rollups(conn: sqlite3.Connection, order: Dict) -> None:
+    conn.execute(
+        "INSERT INTO sales_totals (id, orders, revenue) VALUES (1, 1, ?) "
+        "ON CONFLICT (id) DO UPDATE SET orders = orders + 1, revenue = revenue + excluded.revenue",
+        (order["total"],),
+    )
+    conn.execute(
+        "INSERT INTO sales_daily (day, orders, revenue) VALUES (?, 1, ?) "
+        "ON CONFLICT (day) DO UPDATE SET orders = orders + 1, revenue = revenue + excluded.revenue",
+        (order["order_date"][:10], order["total"]),
+    )
+    conn.execute(
+        "INSERT INTO sales_hourly (hour, orders, revenue) VALUES (?, 1, ?) "
+        "ON CONFLICT (hour) DO UPDATE SET orders = orders + 1, revenue = revenue + excluded.revenue",
+        (order["order_date"][:13], order["total"]),
+    )
+
+
+def rebuild_sales_rollups(conn: sqlite3.Connection) -> None:
+    """Recompute every rollup from the ledger (used once for databases that predate them)."""
+    conn.execute("DELETE FROM sales_totals")
+    conn.execute("DELETE FROM sales_daily")
+    conn.execute("DELETE FROM sales_hourly")
+    conn.execute(
+        "INSERT INTO sales_totals (id, orders, revenue) "
+        "SELECT 1, COUNT(*), COALESCE(SUM(total), 0) FROM orders"
+    )
+    conn.execute(
+        "INSERT INTO sales_daily (day, orders, revenue) "
+        "SELECT substr(order_date, 1, 10), COUNT(*), SUM(total) FROM orders GROUP BY 1"
+    )
+    conn.execute(
+        "INSERT INTO sales_hourly (hour, orders, revenue) "
+        "SELECT substr(order_date, 1, 13), COUNT(*), SUM(total) FROM orders GROUP BY 1"
+    )
+
+
+def sales_summary() -> Dict:
+    """Return ``{"orders", "revenue", "avg_order_value"}`` for the whole shop."""
+    with connection() as conn:
+        row = conn.execute("SELECT orders, revenue FROM sales_totals WHERE id = 1").fetchone()
+    orders, revenue = (row[0], row[1]) if row else (0, 0.0)
+    return {"orders": orders, "revenue": revenue,
+            "avg_order_value": revenue / orders if orders else 0.0}
+
+
+def sales_version() -> int:
+    """Orders appended so far; it changes whenever the ledger and its rollups do."""
+    return sales_summary()["orders"]
+
+
+# Weeks start on Monday; every bucket is labelled with its first day (or hour)
+_SERIES_SQL = {
+    "hour": "SELECT hour AS bucket, orders, revenue FROM sales_hourly "
+            "WHERE hour >= COALESCE(?, hour) AND hour < COALESCE(date(?, '+1 day'), hour || '~') ORDER BY hour",
+    "day": "SELECT day AS bucket, orders, revenue FROM sales_daily "
+           "WHERE day >= COALESCE(?, day) AND day <= COALESCE(?, day) ORDER BY day",
+    "week": "SELECT date(day, 'weekday 0', '-6 days') AS bucket, SUM(orders) AS orders, SUM(revenue) AS revenue "
+            "FROM sales_daily WHERE day >= COALESCE(?, day) AND day <= COALESCE(?, day) GROUP BY 1 ORDER BY 1",
+    "month": "SELECT substr(day, 1, 7) || '-01' AS bucket, SUM(orders) AS orders, SUM(revenue) AS revenue "
+             "FROM sales_daily WHERE day >= COALESCE(?, day) AND day <= COALESCE(?, day) GROUP BY 1 ORDER BY 1",
+}
+GRANULARITIES = tuple(_SERIES_SQL)
+
+
+def sales_series(granularity: str = "day", start: Optional[str] = None,
+                 end: Optional[str] = None) -> List[Dict]:
+    """Return ``{"bucket", "orders", "revenue"}`` rows per hour, day, week or month, oldest first.
+
+    Read from the hourly and daily rollups, so the cost depends on the
+    number of buckets rather than the number of orders. Bounds are
+    inclusive ISO dates.
+    """
+    if granularity not in _SERIES_SQL:
+        raise ValueError(f"Unknown granularity {granularity!r}; expected one of {', '.join(GRANULARITIES)}")
+    with connection() as conn:
+        rows = conn.execute(_SERIES_SQL[granularity], (start, end)).fetchall()
+    return [dict(row) for row in rows]
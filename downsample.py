@@ -0,0 +1,80 @@
+"""
+downsample.py
+Reduce long time series to a fixed point budget for charting.
+
+Both methods return the indices of the points to keep, in order, so the
+caller can pick the same points out of every column of the series.
+"""
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def _bucket_edges(n: int, buckets: int) -> np.ndarray:
+    return np.linspace(0, n, buckets + 1).astype(np.int64)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: keep the points that best preserve the line's shape.
+
+    The first and last points are always kept. The rest are split into
+    ``threshold - 2`` equal buckets, and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket is chosen. Work per bucket is vectorized; only the walk
+    over buckets is a Python loop, so the cost is O(n) plus O(threshold).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = _bucket_edges(n - 2, threshold - 2) + 1
+    # Average of every bucket, with the last point standing in after the final one
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = avg_x[b + 1], avg_y[b + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[b + 1] = a
+    return keep
+
+
+def min_max(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Keep the lowest and highest point of each of ``threshold // 2`` equal buckets.
+
+    Cheaper than LTTB and never hides a spike, at the cost of a more jagged
+    line. Fully vectorized.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+    y = np.asarray(y)
+    edges = _bucket_edges(n, threshold // 2)
+    sizes = np.diff(edges)
+    keep = []
+    for reduce in (np.minimum, np.maximum):
+        extreme = np.repeat(reduce.reduceat(y, edges[:-1]), sizes)
+        # First position in each bucket that holds the bucket's extreme value
+        hits = np.flatnonzero(y == extreme)
+        keep.append(hits[np.searchsorted(hits, edges[:-1])])
+    return np.unique(np.concatenate(keep))
+
+
+def downsample(x: np.ndarray, y: np.ndarray, threshold: int, method: str = "lttb") -> np.ndarray:
+    """Indices of at most ``threshold`` points of the series, chosen by ``method``."""
+    if method == "lttb":
+        return lttb(x, y, threshold)
+    if method == "minmax":
+        return min_max(x, y, threshold)
+    raise ValueError(f"Unknown downsampling method {method!r}; expected one of {', '.join(METHODS)}")
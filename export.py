@@ -0,0 +1,163 @@
+"""
+export.py
+Stream sales line items out of the order ledger as CSV, gzipped CSV or Parquet.
+"""
+
+import csv
+import gzip
+import io
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import BinaryIO, Iterator, List, Optional
+
+from database import connection
+
+CHUNK_ROWS = 10_000
+# Streamlit's download_button reads the whole file into server memory while
+# the button is shown, so larger exports are refused rather than delivered.
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024
+EXPORT_PREFIX = "sales_report_"
+STALE_EXPORT_SECONDS = 60 * 60
+EXPORT_COLUMNS = ["order_id", "order_date", "user_id", "product_id", "name",
+                  "category", "price", "quantity", "revenue"]
+
+
+class ExportError(RuntimeError):
+    """Raised when an export cannot be produced."""
+
+
+def iter_line_items(start: Optional[date] = None, end: Optional[date] = None,
+                    category: Optional[str] = None, chunk_rows: int = CHUNK_ROWS) -> Iterator[List[tuple]]:
+    """Yield lists of at most ``chunk_rows`` line-item rows, oldest order first."""
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("o.order_date >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append("o.order_date < ?")
+        params.append((end + timedelta(days=1)).isoformat())
+    if category is not None:
+        clauses.append("i.category = ?")
+        params.append(category)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with connection() as conn:
+        cur = conn.execute(
+            "SELECT o.order_id, o.order_date, o.user_id, i.product_id, i.name, i.category, "
+            "i.price, i.quantity, i.price * i.quantity "
+            f"FROM orders o JOIN order_items i ON i.order_id = o.order_id {where} "
+            "ORDER BY o.order_id, i.line_no",
+            params,
+        )
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield rows
+
+
+def _write_csv(chunks: Iterator[List[tuple]], raw: BinaryIO) -> int:
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for rows in chunks:
+        writer.writerows(rows)
+        count += len(rows)
+    text.flush()
+    text.detach()
+    return count
+
+
+def _write_csv_gzip(chunks: Iterator[List[tuple]], raw: BinaryIO) -> int:
+    with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+        return _write_csv(chunks, gz)
+
+
+def _write_parquet(chunks: Iterator[List[tuple]], raw: BinaryIO) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ExportError("Parquet export needs the pyarrow package") from exc
+
+    schema = pa.schema([
+        ("order_id", pa.int64()), ("order_date", pa.string()), ("user_id", pa.string()),
+        ("product_id", pa.int64()), ("name", pa.string()), ("category", pa.string()),
+        ("price", pa.float64()), ("quantity", pa.int64()), ("revenue", pa.float64()),
+    ])
+    count = 0
+    # One row group per chunk keeps at most one chunk in memory
+    with pq.ParquetWriter(raw, schema, compression="snappy") as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+            ))
+            count += len(rows)
+    return count
+
+
+# name -> (writer, file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": (_write_csv, "csv", "text/csv"),
+    "CSV (gzip)": (_write_csv_gzip, "csv.gz", "application/gzip"),
+    "Parquet": (_write_parquet, "parquet", "application/vnd.apache.parquet"),
+}
+
+
+def export_sales(raw: BinaryIO, fmt: str = "CSV", start: Optional[date] = None,
+                 end: Optional[date] = None, category: Optional[str] = None,
+                 chunk_rows: int = CHUNK_ROWS) -> int:
+    """Write matching line items to a binary file object; returns the row count."""
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format {fmt!r}")
+    writer = EXPORT_FORMATS[fmt][0]
+    return writer(iter_line_items(start, end, category, chunk_rows), raw)
+
+
+def export_sales_file(fmt: str = "CSV", start: Optional[date] = None, end: Optional[date] = None,
+                      category: Optional[str] = None) -> str:
+    """Export into a temporary file and return its path; the caller removes it."""
+    remove_stale_exports()
+    suffix = "." + EXPORT_FORMATS.get(fmt, (None, "dat"))[1]
+    fd, path = tempfile.mkstemp(prefix=EXPORT_PREFIX, suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            export_sales(fh, fmt, start, end, category)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def read_export(path: str) -> bytes:
+    """Read a finished export for download and remove the file.
+
+    Raises ExportError if it is larger than MAX_DOWNLOAD_BYTES.
+    """
+    try:
+        size = os.path.getsize(path)
+        if size > MAX_DOWNLOAD_BYTES:
+            raise ExportError(f"The export is {size / 2**20:,.0f} MB, over the "
+                              f"{MAX_DOWNLOAD_BYTES / 2**20:,.0f} MB download limit; "
+                              "narrow the period or pick a category")
+        with open(path, "rb") as fh:
+            return fh.read()
+    finally:
+        os.remove(path)
+
+
+def remove_stale_exports(max_age: float = STALE_EXPORT_SECONDS) -> None:
+    """Delete export files left behind by sessions that never downloaded them."""
+    directory = tempfile.gettempdir()
+    cutoff = time.time() - max_age
+    for name in os.listdir(directory):
+        if name.startswith(EXPORT_PREFIX):
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass  # removed by another session meanwhile
@@ -0,0 +1,250 @@
+"""
+headline_store.py
+Append-only, rotating headline archive of timestamped JSONL segments.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+FLUSH_RECORDS = 1_000
+BLOCK_RECORDS = 4_096
+_SEGMENT_NAME = re.compile(r"^headlines-(\d{8})-(\d{4})\.jsonl")
+
+
+class StoreError(RuntimeError):
+    """Raised when the headline archive cannot be written or read."""
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise StoreError("zstd compression needs the zstandard package") from exc
+    return zstandard
+
+
+def _gzip_compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return _zstd().ZstdCompressor(level=6).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return _zstd().ZstdDecompressor().decompressobj().decompress(data)
+
+
+# name -> (file extension, compress, decompress)
+COMPRESSORS = {
+    "gzip": ("gz", _gzip_compress, gzip.decompress),
+    "zstd": ("zst", _zstd_compress, _zstd_decompress),
+}
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%d")
+
+
+class HeadlineStore:
+    """Headlines appended as ``{"ts", "headline", "source"}`` JSON lines.
+
+    Records are buffered and written ``flush_records`` at a time to the
+    active segment, which is rotated once it reaches ``segment_bytes`` or a
+    record from a new UTC day arrives. A closed segment is compressed as a
+    series of independent blocks of ``block_records`` lines (concatenated
+    gzip members or zstd frames, so ``zcat`` still reads the whole file),
+    and a ``.idx.json`` sidecar records each block's offset, length and time
+    range. Time-range reads therefore decompress only the blocks that
+    overlap the range.
+    """
+
+    def __init__(self, root: str = "headlines", compression: str = "gzip",
+                 segment_bytes: int = SEGMENT_BYTES, flush_records: int = FLUSH_RECORDS,
+                 block_records: int = BLOCK_RECORDS):
+        if compression not in COMPRESSORS:
+            raise StoreError(f"Unknown compression {compression!r}")
+        if compression == "zstd":
+            _zstd()
+        self.root = root
+        self.compression = compression
+        self.segment_bytes = segment_bytes
+        self.flush_records = flush_records
+        self.block_records = block_records
+        self._lock = threading.RLock()
+        self._buffer: List[str] = []
+        self._buffer_day: Optional[str] = None
+        self._fh = None
+        self._active: Optional[str] = None
+        self._active_day: Optional[str] = None
+        self._active_size = 0
+        try:
+            os.makedirs(root, exist_ok=True)
+        except OSError as exc:
+            raise StoreError(f"Cannot create headline store {root}: {exc}") from exc
+        self._resume()
+
+    # ── Writing ------------------------------------------------------------------
+    def _resume(self) -> None:
+        """Reopen the newest plain segment left by a previous run; seal any others."""
+        plain = sorted(name for name in os.listdir(self.root)
+                       if _SEGMENT_NAME.match(name) and name.endswith(".jsonl"))
+        for name in plain[:-1]:
+            self._seal(os.path.join(self.root, name))
+        if plain:
+            path = os.path.join(self.root, plain[-1])
+            self._active, self._active_day = path, _SEGMENT_NAME.match(plain[-1]).group(1)
+            self._active_size = os.path.getsize(path)
+
+    def _next_segment(self, day: str) -> str:
+        taken = [int(m.group(2)) for m in map(_SEGMENT_NAME.match, os.listdir(self.root))
+                 if m and m.group(1) == day]
+        return os.path.join(self.root, f"headlines-{day}-{max(taken, default=0) + 1:04d}.jsonl")
+
+    def append(self, headlines: Iterable[str], source: Optional[str] = None, ts: Optional[float] = None) -> int:
+        """Buffer headlines stamped with ``ts`` (default now); returns how many."""
+        ts = time.time() if ts is None else ts
+        day = _day(ts)
+        with self._lock:
+            count = 0
+            for headline in headlines:
+                if self._buffer and day != self._buffer_day:
+                    self.flush()
+                self._buffer_day = day
+                self._buffer.append(json.dumps({"ts": ts, "headline": headline, "source": source},
+                                               ensure_ascii=False) + "\n")
+                count += 1
+                if len(self._buffer) >= self.flush_records:
+                    self.flush()
+            return count
+
+    def flush(self) -> None:
+        """Write buffered records to the active segment in one call."""
+        with self._lock:
+            if not self._buffer:
+                return
+            day = self._buffer_day
+            if self._active is not None and (day != self._active_day or self._active_size >= self.segment_bytes):
+                self.rotate()
+            if self._active is None:
+                self._active, self._active_day, self._active_size = self._next_segment(day), day, 0
+            data = "".join(self._buffer).encode("utf-8")
+            try:
+                if self._fh is None:
+                    self._fh = open(self._active, "ab", buffering=256 * 1024)
+                self._fh.write(data)
+                self._fh.flush()
+            except OSError as exc:
+                raise StoreError(f"Cannot write {self._active}: {exc}") from exc
+            self._active_size += len(data)
+            self._buffer = []
+
+    def rotate(self) -> None:
+        """Close, compress and index the active segment."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if self._active is not None:
+                self._seal(self._active)
+            self._active = self._active_day = None
+            self._active_size = 0
+
+    def _seal(self, path: str) -> None:
+        ext, compress, _ = COMPRESSORS[self.compression]
+        target = f"{path}.{ext}"
+        blocks = []
+        try:
+            with open(path, "rb") as src, open(target + ".tmp", "wb") as dst:
+                offset = 0
+                while True:
+                    lines = [line for _, line in zip(range(self.block_records), src)]
+                    if not lines:
+                        break
+                    stamps = [json.loads(line)["ts"] for line in lines]
+                    data = compress(b"".join(lines))
+                    dst.write(data)
+                    blocks.append({"offset": offset, "length": len(data), "records": len(lines),
+                                   "first_ts": min(stamps), "last_ts": max(stamps)})
+                    offset += len(data)
+            index = {"segment": os.path.basename(target), "compression": self.compression,
+                     "records": sum(b["records"] for b in blocks),
+                     "first_ts": min((b["first_ts"] for b in blocks), default=None),
+                     "last_ts": max((b["last_ts"] for b in blocks), default=None),
+                     "blocks": blocks}
+            with open(target + ".idx.json.tmp", "w", encoding="utf-8") as fh:
+                json.dump(index, fh)
+            # Publish the data before its index, and drop the plain file last
+            os.replace(target + ".tmp", target)
+            os.replace(target + ".idx.json.tmp", target + ".idx.json")
+            os.remove(path)
+        except (OSError, ValueError, KeyError) as exc:
+            raise StoreError(f"Cannot seal segment {path}: {exc}") from exc
+
+    def close(self) -> None:
+        """Flush buffered records; the active segment stays open for the next run."""
+        with self._lock:
+            self.flush()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ── Reading ------------------------------------------------------------------
+    def segments(self) -> List[Dict]:
+        """Indexes of the sealed segments, oldest first."""
+        indexes = []
+        for name in sorted(os.listdir(self.root)):
+            if name.endswith(".idx.json"):
+                try:
+                    with open(os.path.join(self.root, name), encoding="utf-8") as fh:
+                        indexes.append(json.load(fh))
+                except (OSError, ValueError) as exc:
+                    raise StoreError(f"Cannot read index {name}: {exc}") from exc
+        return indexes
+
+    def read(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict]:
+        """Yield records with ``start <= ts < end``, oldest segment first."""
+        def overlaps(first, last):
+            return first is not None and (start is None or last >= start) and (end is None or first < end)
+
+        def wanted(record):
+            return (start is None or record["ts"] >= start) and (end is None or record["ts"] < end)
+
+        for index in self.segments():
+            if not overlaps(index["first_ts"], index["last_ts"]):
+                continue
+            decompress = COMPRESSORS[index["compression"]][2]
+            with open(os.path.join(self.root, index["segment"]), "rb") as fh:
+                for block in index["blocks"]:
+                    if not overlaps(block["first_ts"], block["last_ts"]):
+                        continue
+                    fh.seek(block["offset"])
+                    for line in decompress(fh.read(block["length"])).splitlines():
+                        record = json.loads(line)
+                        if wanted(record):
+                            yield record
+        with self._lock:
+            self.flush()
+            active = self._active
+        if active is not None and os.path.exists(active):
+            with open(active, "rb") as fh:
+                for line in fh:
+                    record = json.loads(line)
+                    if wanted(record):
+                        yield record
+
+    def headlines_between(self, start: Optional[float] = None, end: Optional[float] = None) -> List[str]:
+        return [record["headline"] for record in self.read(start, end)]
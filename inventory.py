@@ -0,0 +1,190 @@
+"""
+inventory.py
+Per-SKU stock reservations for carts and atomic stock decrements at checkout.
+"""
+
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from database import OutOfStockError, decrement_stock, increment_stock, read_stock, stock_adjustments
+
+RESERVATION_TTL = 15 * 60   # seconds an untouched cart line keeps its units
+LOCK_STRIPES = 64
+
+
+class _Sku:
+    """Stock and live holds for one product; guarded by its stripe lock."""
+
+    __slots__ = ("stock", "adjustments", "reserved", "holds", "expiries")
+
+    def __init__(self, stock: int, adjustments: int):
+        self.stock = stock
+        self.adjustments = adjustments                  # stock_adjustments() when stock was read
+        self.reserved = 0
+        self.holds: Dict[str, List[float]] = {}        # holder -> [quantity, expires_at]
+        self.expiries: List[Tuple[float, str]] = []    # min-heap, stale entries skipped
+
+    def available(self) -> int:
+        return self.stock - self.reserved
+
+    def expire(self, now: float) -> None:
+        while self.expiries and self.expiries[0][0] <= now:
+            expires_at, holder = heapq.heappop(self.expiries)
+            hold = self.holds.get(holder)
+            if hold is not None and hold[1] == expires_at:
+                self.reserved -= hold[0]
+                del self.holds[holder]
+
+    def set_hold(self, holder: str, quantity: int, expires_at: float) -> None:
+        previous = self.holds.pop(holder, None)
+        if previous is not None:
+            self.reserved -= previous[0]
+        if quantity > 0:
+            self.holds[holder] = [quantity, expires_at]
+            self.reserved += quantity
+            heapq.heappush(self.expiries, (expires_at, holder))
+
+
+class InventoryEngine:
+    """Reservation engine with one lock per stripe of SKUs instead of a global lock.
+
+    A holder (one shopping session) reserves units when it adds them to its
+    cart. Holds expire after ``ttl`` seconds unless refreshed. ``purchase``
+    converts a holder's lines into a single all-or-nothing stock decrement in
+    the database, which stays authoritative across worker processes.
+    """
+
+    def __init__(self, ttl: float = RESERVATION_TTL, stripes: int = LOCK_STRIPES, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._skus: Dict[int, _Sku] = {}
+
+    def _lock(self, product_id: int) -> threading.Lock:
+        return self._stripes[hash(product_id) % len(self._stripes)]
+
+    def _sku(self, product_id: int) -> Optional[_Sku]:
+        # Caller holds the stripe lock. Checkouts keep the cached stock current;
+        # restocks and admin edits move stock_adjustments and trigger a re-read.
+        sku = self._skus.get(product_id)
+        adjustments = stock_adjustments()
+        if sku is None or sku.adjustments != adjustments:
+            stock = read_stock(product_id)
+            if stock is None:
+                self._skus.pop(product_id, None)
+                return None
+            if sku is None:
+                sku = self._skus[product_id] = _Sku(stock, adjustments)
+            else:
+                sku.stock, sku.adjustments = stock, adjustments
+        sku.expire(self.clock())
+        return sku
+
+    def available(self, product_id: int) -> int:
+        """Units free to reserve; 0 for unknown products."""
+        with self._lock(product_id):
+            sku = self._sku(product_id)
+            return sku.available() if sku else 0
+
+    def held(self, holder: str, product_id: int) -> int:
+        with self._lock(product_id):
+            sku = self._sku(product_id)
+            hold = sku.holds.get(holder) if sku else None
+            return hold[0] if hold else 0
+
+    def reserve(self, holder: str, product_id: int, quantity: int = 1) -> bool:
+        """Add ``quantity`` units to the holder's reservation; False if not enough stock is free
+        or the product does not exist."""
+        return self._hold(holder, product_id, quantity, relative=True)
+
+    def set_reservation(self, holder: str, product_id: int, quantity: int) -> bool:
+        """Make the holder's reservation exactly ``quantity`` units and refresh its TTL."""
+        return self._hold(holder, product_id, quantity, relative=False)
+
+    def _hold(self, holder: str, product_id: int, quantity: int, relative: bool) -> bool:
+        with self._lock(product_id):
+            sku = self._sku(product_id)
+            if sku is None:
+                return False
+            hold = sku.holds.get(holder)
+            current = hold[0] if hold else 0
+            target = current + quantity if relative else quantity
+            if target - current > sku.available():
+                return False
+            sku.set_hold(holder, target, self.clock() + self.ttl)
+            return True
+
+    def release(self, holder: str, product_id: int) -> None:
+        with self._lock(product_id):
+            sku = self._skus.get(product_id)
+            if sku is not None:
+                sku.set_hold(holder, 0, 0.0)
+
+    def release_all(self, holder: str, product_ids) -> None:
+        for product_id in product_ids:
+            self.release(holder, product_id)
+
+    def purchase(self, holder: str, lines: Dict[int, int]) -> None:
+        """Atomically take every line of ``{product_id: quantity}`` out of stock.
+
+        The holder's own reservations count towards each line; anything beyond
+        them must still be free. Raises OutOfStockError and changes nothing if
+        any line cannot be filled.
+        """
+        product_ids = sorted(lines)
+        stripes = sorted({id(lock): lock for lock in map(self._lock, product_ids)}.values(), key=id)
+        for lock in stripes:
+            lock.acquire()
+        try:
+            for product_id in product_ids:
+                sku = self._sku(product_id)
+                hold = sku.holds.get(holder) if sku else None
+                if sku is None or lines[product_id] > sku.available() + (hold[0] if hold else 0):
+                    raise OutOfStockError(product_id, f"Not enough stock for product {product_id}")
+            try:
+                decrement_stock(lines)
+            except OutOfStockError as exc:
+                # Another worker process sold it first; resync from the database
+                self._resync(exc.product_id)
+                raise
+            for product_id in product_ids:
+                sku = self._skus[product_id]
+                sku.set_hold(holder, 0, 0.0)
+                sku.stock -= lines[product_id]
+        finally:
+            for lock in reversed(stripes):
+                lock.release()
+
+    def restock(self, lines: Dict[int, int]) -> None:
+        """Return units to stock, e.g. when an order could not be recorded.
+
+        The write moves ``stock_adjustments``, so every cached SKU re-reads
+        its stock on next use instead of being adjusted here a second time.
+        """
+        increment_stock(lines)
+
+    def resync(self, product_id: int) -> None:
+        """Re-read a product's stock from the database, keeping its live holds."""
+        with self._lock(product_id):
+            self._resync(product_id)
+
+    def _resync(self, product_id: int) -> None:
+        sku = self._skus.get(product_id)
+        if sku is not None:
+            sku.stock = read_stock(product_id) or 0
+
+
+_engine: Optional[InventoryEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_inventory() -> InventoryEngine:
+    """Return the process-wide engine shared by all sessions."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = InventoryEngine()
+    return _engine
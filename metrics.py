@@ -0,0 +1,133 @@
+"""
+metrics.py
+Counters and stage timings for the headline scraper, exported as
+Prometheus text or JSON.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    body = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return f"{name}{{{body}}}"
+
+
+class Metrics:
+    """Thread-safe counters, gauges and duration summaries keyed by name and labels."""
+
+    def __init__(self, prefix: str = "headlines"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        self._timings: Dict[str, Dict[Labels, list]] = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        with self._lock:
+            self._counters[name][_labels(labels)] += amount
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[name][_labels(labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        with self._lock:
+            summary = self._timings[name][_labels(labels)]
+            summary[0] += 1
+            summary[1] += seconds
+
+    def timer(self, name: str, **labels) -> "_Timer":
+        """``with metrics.timer("stage_seconds", stage="clean"): ...``"""
+        return _Timer(self, name, labels)
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {full} counter")
+                lines += [f"{_format(full, labels)} {value:g}" for labels, value in sorted(series.items())]
+            for name, series in sorted(self._gauges.items()):
+                full = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {full} gauge")
+                lines += [f"{_format(full, labels)} {value:g}" for labels, value in sorted(series.items())]
+            for name, series in sorted(self._timings.items()):
+                full = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {full} summary")
+                for labels, (count, total) in sorted(series.items()):
+                    lines.append(f"{_format(full + '_count', labels)} {count}")
+                    lines.append(f"{_format(full + '_sum', labels)} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        def rows(series, value):
+            return [dict(labels, value=value(v)) for labels, v in sorted(series.items())]
+
+        with self._lock:
+            return {
+                "generated_at": time.time(),
+                "counters": {n: rows(s, lambda v: v) for n, s in self._counters.items()},
+                "gauges": {n: rows(s, lambda v: v) for n, s in self._gauges.items()},
+                "timings": {n: rows(s, lambda v: {"count": v[0], "sum": v[1]}) for n, s in self._timings.items()},
+            }
+
+    def write_json(self, path: str) -> None:
+        """Replace ``path`` atomically with the current snapshot."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.snapshot(), fh, indent=2)
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve ``/metrics`` (Prometheus text) and ``/metrics.json`` from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, kind = metrics.render_prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, kind = json.dumps(metrics.snapshot()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+
+
+class _Timer:
+    def __init__(self, metrics: Metrics, name: str, labels: Dict[str, str]):
+        self.metrics, self.name, self.labels = metrics, name, labels
+        self.elapsed: Optional[float] = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._started
+        self.metrics.observe(self.name, self.elapsed, **self.labels)
@@ -0,0 +1,411 @@
+"""
+scraper.py
+Responsible for network I/O and basic HTML parsing.
+"""
+
+import codecs
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "CommanderGH-headlines/1.0"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_SELECTORS = ("h3",)
+STREAM_CHUNK = 64 * 1024
+SELECTOR_RE = re.compile(r"([a-z][a-z0-9]*)(?:\.([-\w]+))?", re.IGNORECASE)
+
+
+class FetchError(RuntimeError):
+    """Raised when the network or HTML layer fails."""
+
+
+def parse_selectors(selectors: Sequence[str]) -> List[Tuple[str, Optional[str]]]:
+    """Split selectors into ``(tag, class)`` pairs, class None when absent.
+
+    Both parsing modes accept only ``tag`` and ``tag.class`` selectors, so a
+    selector list behaves the same whether or not the body is streamed.
+    Tag names are case-insensitive and class names case-sensitive, as in
+    HTML. Anything else (ids, attributes, combinators, several classes)
+    raises ValueError up front instead of silently matching nothing.
+    """
+    parsed = []
+    for selector in selectors:
+        match = SELECTOR_RE.fullmatch(selector.strip())
+        if match is None:
+            raise ValueError(f"Unsupported selector {selector!r}; expected 'tag' or 'tag.class'")
+        parsed.append((match.group(1).lower(), match.group(2)))
+    if not parsed:
+        raise ValueError("At least one selector is required")
+    return parsed
+
+
+def parse_headlines(html: str, selectors: Sequence[str] = DEFAULT_SELECTORS) -> List[str]:
+    parse_selectors(selectors)
+    try:
+        soup = BeautifulSoup(html, "html.parser")
+    except Exception as exc:
+        raise FetchError(f"BeautifulSoup failure: {exc}") from exc
+
+    # The Guardian uses <h3> tags for most headlines
+    tags = soup.select(", ".join(selectors))
+    if not tags:
+        raise FetchError(f"No {', '.join(selectors)} tags found – HTML structure may have changed.")
+
+    headlines = [text for text in (h.get_text(strip=True) for h in tags) if text]
+    if not headlines:
+        raise FetchError(f"No text extracted from {', '.join(selectors)} tags.")
+    return headlines
+
+
+class _Capture:
+    """Text collected for one open match of a selector."""
+
+    __slots__ = ("tag", "depth", "parts")
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.depth = 1          # nesting of ``tag`` inside the match, itself included
+        self.parts: List[str] = []
+
+
+class HeadlineExtractor(HTMLParser):
+    """Incremental headline extraction without building a document tree.
+
+    Selectors are ``tag`` or ``tag.class`` strings, as in ``parse_selectors``,
+    and the output matches ``parse_headlines``: text is joined the way
+    ``get_text(strip=True)`` joins it, ``<script>`` and ``<style>`` contents
+    are left out, and a match nested inside another match is a headline of
+    its own. Headlines come out in document order, each as soon as it and
+    every match opened before it have closed.
+    """
+
+    RAW_TEXT_TAGS = ("script", "style")
+
+    def __init__(self, selectors: Sequence[str] = DEFAULT_SELECTORS):
+        super().__init__(convert_charrefs=True)
+        self.rules: Dict[str, List[Optional[str]]] = {}
+        for tag, cls in parse_selectors(selectors):
+            self.rules.setdefault(tag, []).append(cls)
+        self.headlines: List[str] = []
+        self._open: List[_Capture] = []     # matches still open, outermost first
+        self._queue: List[_Capture] = []    # matches in document order, not yet handed out
+        self._text: List[str] = []          # current text node, may arrive in pieces
+        self._raw: Optional[str] = None     # script/style element whose text is being skipped
+        self._raw_capture: Optional[_Capture] = None   # ...unless that element is itself a match
+
+    def _matches(self, tag: str, attrs) -> bool:
+        wanted = self.rules.get(tag)
+        if wanted is None:
+            return False
+        if None in wanted:
+            return True
+        classes = next((v.split() for k, v in attrs if k == "class" and v), [])
+        return any(cls in classes for cls in wanted)
+
+    def _end_text_node(self):
+        if self._text:
+            text = "".join(self._text).strip()
+            if text:
+                if self._raw is None:
+                    for capture in self._open:
+                        capture.parts.append(text)
+                elif self._raw_capture is not None:
+                    self._raw_capture.parts.append(text)
+            self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        self._end_text_node()
+        for capture in self._open:
+            if capture.tag == tag:
+                capture.depth += 1
+        capture = None
+        if self._matches(tag, attrs):
+            capture = _Capture(tag)
+            self._open.append(capture)
+            self._queue.append(capture)
+        if tag in self.RAW_TEXT_TAGS:
+            self._raw, self._raw_capture = tag, capture
+
+    def handle_endtag(self, tag):
+        self._end_text_node()
+        if tag == self._raw:
+            self._raw = self._raw_capture = None
+        closed = False
+        for capture in self._open:
+            if capture.tag == tag:
+                capture.depth -= 1
+                closed = closed or capture.depth == 0
+        if closed:
+            self._open = [capture for capture in self._open if capture.depth > 0]
+            self._release()
+
+    def handle_data(self, data):
+        # Text is handed over at chunk boundaries too, so strip whole nodes only
+        if self._open:
+            self._text.append(data)
+
+    def handle_comment(self, data):
+        # Comments are dropped from the text but still end the text node around them
+        self._end_text_node()
+
+    def close(self):
+        super().close()
+        self._end_text_node()
+        for capture in self._open:      # unclosed at the end of the document
+            capture.depth = 0
+        self._open = []
+        self._release()
+
+    def _release(self):
+        """Move the finished matches at the front of the queue to ``headlines``."""
+        done = 0
+        for capture in self._queue:
+            if capture.depth > 0:
+                break
+            done += 1
+            text = "".join(capture.parts)
+            if text:
+                self.headlines.append(text)
+        del self._queue[:done]
+
+    def drain(self) -> List[str]:
+        """Return and forget the headlines completed so far."""
+        done, self.headlines = self.headlines, []
+        return done
+
+
+def iter_headlines(chunks: Iterable[bytes], selectors: Sequence[str] = DEFAULT_SELECTORS,
+                   encoding: Optional[str] = None) -> Iterator[str]:
+    """Yield headlines while the body is still arriving in byte chunks."""
+    try:
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parser = HeadlineExtractor(selectors)
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        yield from parser.drain()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.drain()
+
+
+def stream_headlines(resp: requests.Response, selectors: Sequence[str] = DEFAULT_SELECTORS) -> List[str]:
+    """Extract headlines from a ``stream=True`` response without buffering the body."""
+    headlines = list(iter_headlines(resp.iter_content(STREAM_CHUNK), selectors, resp.encoding))
+    if not headlines:
+        raise FetchError(f"No text extracted from {', '.join(selectors)} tags.")
+    return headlines
+
+
+def fetch_headlines(url: str, session: Optional[requests.Session] = None,
+                    selectors: Sequence[str] = DEFAULT_SELECTORS, streaming: bool = False) -> List[str]:
+    try:
+        resp = (session or requests).get(url, timeout=15, stream=streaming)
+        resp.raise_for_status()
+    except requests.exceptions.RequestException as exc:
+        raise FetchError(f"Network failure: {exc}") from exc
+    if not streaming:
+        return parse_headlines(resp.text, selectors)
+    try:
+        return stream_headlines(resp, selectors)
+    except requests.exceptions.RequestException as exc:
+        raise FetchError(f"Network failure: {exc}") from exc
+    finally:
+        resp.close()
+
+
+# ── Concurrent crawler --------------------------------------------------------
+@dataclass
+class CrawlResult:
+    url: str
+    headlines: List[str] = field(default_factory=list)
+    not_modified: bool = False          # server answered 304 to our conditional GET
+    error: Optional[str] = None
+    status: Optional[int] = None
+    attempts: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class HostLimiter:
+    """Caps concurrent requests and spaces out request starts per host."""
+
+    def __init__(self, max_concurrency: int = 2, min_interval: float = 1.0):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, host: str):
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.Semaphore(self.max_concurrency))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class HeadlineCrawler:
+    """Fetch many pages at once over pooled keep-alive connections.
+
+    Each host gets at most ``per_host`` requests in flight, started at least
+    ``min_interval`` seconds apart. Network errors, 429 and 5xx answers are
+    retried with jittered exponential backoff (or the server's Retry-After).
+    ETag and Last-Modified validators are remembered per URL so unchanged
+    pages come back as cheap 304s. Failures are reported per URL instead of
+    aborting the whole crawl. With ``streaming`` (the default) bodies are
+    parsed incrementally by HeadlineExtractor instead of BeautifulSoup.
+    """
+
+    def __init__(self, max_workers: int = 8, per_host: int = 2, min_interval: float = 1.0,
+                 retries: int = 3, backoff: float = 0.5, timeout: float = 15,
+                 session: Optional[requests.Session] = None,
+                 selectors: Sequence[str] = DEFAULT_SELECTORS, streaming: bool = True):
+        self.max_workers = max_workers
+        parse_selectors(selectors)
+        self.selectors = tuple(selectors)
+        self.streaming = streaming
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = HostLimiter(per_host, min_interval)
+        self.session = session or self._make_session(max_workers)
+        self.validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._validators_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl")
+
+    @staticmethod
+    def _make_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        with self._validators_lock:
+            etag, last_modified = self.validators.get(url, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def _retry_delay(self, attempt: int, resp: Optional[requests.Response]) -> float:
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def fetch(self, url: str) -> CrawlResult:
+        result = CrawlResult(url)
+        host = urlsplit(url).netloc
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            resp = None
+            try:
+                with self.limiter.slot(host):
+                    resp = self.session.get(url, timeout=self.timeout, stream=True,
+                                            headers=self._conditional_headers(url))
+                    result.status = resp.status_code
+                    if resp.status_code == 304:
+                        result.not_modified = True
+                        break
+                    if resp.status_code not in RETRY_STATUSES:
+                        resp.raise_for_status()
+                        result.headlines = self._extract(resp, result)
+                        with self._validators_lock:
+                            self.validators[url] = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+                        result.error = None
+                        break
+                    result.bytes += len(resp.content)
+                    result.error = f"HTTP {resp.status_code}"
+            except FetchError as exc:
+                result.error = str(exc)
+                break          # the page arrived but did not parse; retrying will not help
+            except requests.exceptions.HTTPError as exc:
+                result.error = f"Network failure: {exc}"
+                break          # other 4xx answers are not transient
+            except requests.exceptions.RequestException as exc:
+                result.error = f"Network failure: {exc}"
+            finally:
+                if resp is not None:
+                    resp.close()
+            if attempt < self.retries:
+                delay = self._retry_delay(attempt, resp)
+                logging.debug("Retrying %s in %.2fs (%s)", url, delay, result.error)
+                time.sleep(delay)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _extract(self, resp: requests.Response, result: CrawlResult) -> List[str]:
+        if not self.streaming:
+            result.bytes += len(resp.content)
+            return parse_headlines(resp.text, self.selectors)
+
+        def counted(chunks):
+            for chunk in chunks:
+                result.bytes += len(chunk)
+                yield chunk
+
+        headlines = list(iter_headlines(counted(resp.iter_content(STREAM_CHUNK)),
+                                        self.selectors, resp.encoding))
+        if not headlines:
+            raise FetchError(f"No text extracted from {', '.join(self.selectors)} tags.")
+        return headlines
+
+    def crawl(self, urls: Iterable[str]) -> List[CrawlResult]:
+        """Fetch every URL concurrently; results keep the order of ``urls``."""
+        return list(self._pool.map(self.fetch, urls))
+
+    def iter_crawl(self, urls: Iterable[str]) -> Iterator[CrawlResult]:
+        """Fetch every URL concurrently, yielding each result as soon as it is done.
+
+        The caller can process one source while the others are still downloading.
+        """
+        futures = [self._pool.submit(self.fetch, url) for url in urls]
+        for future in as_completed(futures):
+            yield future.result()
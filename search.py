@@ -0,0 +1,251 @@
+"""
+search.py
+Full-text product search: an in-memory inverted index over product name and
+category with prefix matching, trigram typo tolerance and relevance ranking.
+"""
+
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from catalog import ALL_CATEGORIES, PAGE_SIZE, Page, clamp_page, get_catalog_index
+from database import catalog_version, load_products
+
+NAME_WEIGHT = 2.0
+CATEGORY_WEIGHT = 1.0
+EXACT, PREFIX, FUZZY = 1.0, 0.7, 0.5   # match quality multipliers
+MAX_PREFIX_TERMS = 64                  # vocabulary words a short prefix may expand to
+MIN_SIMILARITY = 0.4                   # trigram Jaccard needed for a typo match
+MAX_RESULTS = 1000
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.casefold())
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Inverted index from words to the products containing them.
+
+    Each product gets a dense slot. A word's postings are kept as a
+    ``{slot: field weight}`` dict for cheap updates and materialized on
+    demand as NumPy arrays, so a query scores and intersects its terms with
+    a few vectorized passes over slot-sized arrays instead of Python loops
+    over every match. Each slot also holds the product's price and a
+    category code, so category and price filters are masks in the same pass. A sorted vocabulary answers prefix queries with a
+    bisect, and a trigram index over the vocabulary finds words within a
+    typo or two when a term has no exact or prefix match. Products are
+    added, changed and removed one at a time, so a catalog change costs only
+    the products it touched.
+    """
+
+    def __init__(self, products: Iterable[Dict] = ()):
+        self.version: Optional[int] = None
+        self.size = 0                                          # slots handed out
+        self._slot_of: Dict[int, int] = {}                     # product id -> slot
+        self._product_ids = np.zeros(1024, np.int64)           # slot -> product id
+        self._name_length = np.zeros(1024, np.float64)         # slot -> name length, for tie-breaks
+        self._price = np.zeros(1024, np.float64)               # slot -> price
+        self._category = np.full(1024, -1, np.int64)           # slot -> category code
+        self._category_codes: Dict[str, int] = {}
+        self._fields: Dict[int, Tuple[str, str]] = {}          # product id -> (name, category) as indexed
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._vocabulary: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        for product in products:
+            self.add(product)
+
+    # ── Maintenance ------------------------------------------------------------
+    def _weights(self, name: str, category: str) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for word in tokenize(category):
+            weights[word] = CATEGORY_WEIGHT
+        for word in tokenize(name):
+            weights[word] = max(weights.get(word, 0.0), NAME_WEIGHT)
+        return weights
+
+    def _slot(self, product_id: int) -> int:
+        slot = self._slot_of.get(product_id)
+        if slot is None:
+            slot = self._slot_of[product_id] = self.size
+            if slot == len(self._product_ids):
+                self._product_ids = np.concatenate([self._product_ids, np.zeros_like(self._product_ids)])
+                self._name_length = np.concatenate([self._name_length, np.zeros_like(self._name_length)])
+                self._price = np.concatenate([self._price, np.zeros_like(self._price)])
+                self._category = np.concatenate([self._category, np.full_like(self._category, -1)])
+            self._product_ids[slot] = product_id
+            self.size += 1
+        return slot
+
+    def add(self, product: Dict) -> None:
+        """Index a product, replacing its previous entry if any."""
+        with self._lock:
+            fields = (product["name"], product.get("category", ""))
+            if self._fields.get(product["id"]) == fields:
+                self._price[self._slot_of[product["id"]]] = product.get("price", 0.0)
+                return
+            self.remove(product["id"])
+            slot = self._slot(product["id"])
+            self._fields[product["id"]] = fields
+            self._name_length[slot] = len(fields[0])
+            self._price[slot] = product.get("price", 0.0)
+            self._category[slot] = self._category_codes.setdefault(fields[1], len(self._category_codes))
+            for word, weight in self._weights(*fields).items():
+                postings = self._postings.get(word)
+                if postings is None:
+                    postings = self._postings[word] = {}
+                    insort(self._vocabulary, word)
+                    for gram in trigrams(word):
+                        self._trigrams.setdefault(gram, set()).add(word)
+                postings[slot] = weight
+                self._arrays.pop(word, None)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            fields = self._fields.pop(product_id, None)
+            if fields is None:
+                return
+            slot = self._slot_of[product_id]     # kept, so a re-added product reuses it
+            for word in self._weights(*fields):
+                postings = self._postings[word]
+                postings.pop(slot, None)
+                self._arrays.pop(word, None)
+                if not postings:
+                    del self._postings[word]
+                    del self._vocabulary[bisect_left(self._vocabulary, word)]
+                    for gram in trigrams(word):
+                        self._trigrams[gram].discard(word)
+
+    def sync(self, version: int, products: List[Dict]) -> None:
+        """Bring the index up to a catalog version, re-indexing only changed products."""
+        with self._lock:
+            current = {p["id"] for p in products}
+            for product_id in [pid for pid in self._fields if pid not in current]:
+                self.remove(product_id)
+            fields = self._fields
+            for product in products:
+                if fields.get(product["id"]) != (product["name"], product.get("category", "")):
+                    self.add(product)
+            # Prices are not indexed words, so refresh them all in one vectorized store
+            slots = np.fromiter((self._slot_of[p["id"]] for p in products), np.int64, len(products))
+            self._price[slots] = np.fromiter((p.get("price", 0.0) for p in products), np.float64, len(products))
+            self.version = version
+
+    # ── Queries ------------------------------------------------------------------
+    def _expand(self, term: str) -> Dict[str, float]:
+        """Vocabulary words a query term may stand for, with their match quality."""
+        matches: Dict[str, float] = {}
+        if term in self._postings:
+            matches[term] = EXACT
+        start = bisect_left(self._vocabulary, term)
+        for word in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not word.startswith(term):
+                break
+            matches.setdefault(word, PREFIX)
+        if matches or len(term) < 3:
+            return matches
+        grams = trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for word in self._trigrams.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        for word, count in shared.items():
+            similarity = count / (len(grams) + len(word) + 1 - count)
+            if similarity >= MIN_SIMILARITY:
+                matches[word] = FUZZY * similarity
+        return matches
+
+    def _posting_arrays(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(word)
+        if arrays is None:
+            postings = self._postings[word]
+            arrays = self._arrays[word] = (np.fromiter(postings.keys(), np.int64, len(postings)),
+                                           np.fromiter(postings.values(), np.float64, len(postings)))
+        return arrays
+
+    def search_ids(self, text: str, limit: int = MAX_RESULTS, category: str = ALL_CATEGORIES,
+                   min_price: Optional[float] = None, max_price: Optional[float] = None) -> List[int]:
+        """Ids of the products matching every word of ``text``, best first.
+
+        The category and (inclusive) price bounds are applied as masks before
+        the top ``limit`` are picked, so the limit counts filtered results.
+        """
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return []
+        with self._lock:
+            total = np.zeros(self.size)
+            matched = None
+            for term in terms:
+                scores = np.zeros(self.size)
+                for word, quality in self._expand(term).items():
+                    slots, weights = self._posting_arrays(word)
+                    # Slots are unique within a word, so plain fancy indexing is safe
+                    scores[slots] = np.maximum(scores[slots], weights * quality)
+                hit = scores > 0
+                matched = hit if matched is None else matched & hit
+                total += scores
+            if category != ALL_CATEGORIES:
+                code = self._category_codes.get(category)
+                if code is None:
+                    return []
+                matched &= self._category[:self.size] == code
+            if min_price is not None:
+                matched &= self._price[:self.size] >= min_price
+            if max_price is not None:
+                matched &= self._price[:self.size] <= max_price
+            candidates = np.flatnonzero(matched)
+            if not len(candidates):
+                return []
+            # Higher score first, then the shorter (more specific) name, then the lower id
+            key = -total[candidates] * 1e4 + self._name_length[candidates]
+            if len(candidates) > limit:
+                top = np.argpartition(key, limit - 1)[:limit]
+                candidates, key = candidates[top], key[top]
+            ids = self._product_ids[candidates]
+            return ids[np.lexsort((ids, key))].tolist()
+
+    def search(self, text: str, limit: int = MAX_RESULTS) -> List[Dict]:
+        """Products matching every word of ``text``, best first, with live price and stock."""
+        by_id = get_catalog_index().by_id
+        products = (by_id.get(product_id) for product_id in self.search_ids(text, limit))
+        return [p for p in products if p is not None]
+
+
+_index = SearchIndex()
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Return the shared index, synced to the current catalog version."""
+    version = catalog_version()
+    if _index.version != version:
+        with _index_lock:
+            if _index.version != version:
+                _index.sync(version, load_products())
+    return _index
+
+
+def search_products(text: str, category: str = ALL_CATEGORIES, min_price: Optional[float] = None,
+                    max_price: Optional[float] = None, page: int = 1, page_size: int = PAGE_SIZE) -> Page:
+    """One page of search results, optionally narrowed to a category and price range.
+
+    At most MAX_RESULTS products are ranked across all pages, counted after the
+    filters; only the requested page is looked up in the catalog.
+    """
+    ids = get_search_index().search_ids(text, MAX_RESULTS, category, min_price, max_price)
+    page, pages, start = clamp_page(page, page_size, len(ids))
+    by_id = get_catalog_index().by_id
+    items = [by_id[product_id] for product_id in ids[start:start + page_size] if product_id in by_id]
+    return Page(items, page, pages, len(ids))
@@ -0,0 +1,216 @@
+"""
+stock_monitor.py
+Low-stock monitoring: days of cover per SKU from forecast demand, with
+per-SKU reorder points and a cheap view of the most at-risk products.
+"""
+
+import heapq
+import math
+import threading
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from analytics import get_line_items
+from database import load_products, read_stocks, stock_adjustments
+
+LONG_WINDOW = 28       # days of order history behind the demand forecast
+SHORT_WINDOW = 7       # recent days weighted in so a trend shows up quickly
+SHORT_WEIGHT = 0.5     # share of the short moving average in the forecast
+LEAD_TIME_DAYS = 7     # days a reorder takes to arrive
+SERVICE_Z = 1.65       # safety stock for a ~95% chance of not running out during the lead time
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()   # line item days count from here
+
+
+class StockMonitor:
+    """Days of cover and reorder points per product, kept in a lazily pruned min-heap.
+
+    Each product has a dense slot holding its stock and its daily units sold
+    over the last ``LONG_WINDOW`` days. The forecast is a blend of the short
+    and long moving averages of those units; the reorder point covers the
+    forecast over the lead time plus safety stock for its variability.
+
+    ``refresh`` only revisits the products touched since the last call: the
+    lines of newly appended orders and any stock changes in the catalog. Their
+    new days of cover are pushed onto the heap and older entries are skipped
+    when met, so reading the ``k`` most at-risk products costs O(k log n)
+    instead of a pass over the catalog.
+    """
+
+    def __init__(self, lead_time: float = LEAD_TIME_DAYS, today: Callable[[], date] = date.today):
+        self.lead_time = lead_time
+        self.today = today
+        self.size = 0
+        self._slot_of: Dict[int, int] = {}
+        self._product_ids = np.zeros(1024, np.int64)
+        self._stock = np.zeros(1024, np.int64)
+        self._history = np.zeros((1024, LONG_WINDOW))       # slot x day, oldest day first
+        self._forecast = np.zeros(1024)
+        self._reorder_point = np.zeros(1024)
+        self._cover = np.full(1024, math.inf)
+        self._heap: List[tuple] = []                        # (days of cover, product id), stale entries skipped
+        self._below: set = set()                            # product ids at or under their reorder point
+        self._slot_for_code = np.zeros(0, np.int64)         # line item product code -> slot
+        self._first_day: Optional[int] = None               # day number of history column 0
+        self._lines_seen = 0
+        self._adjustments = None
+        self._lock = threading.RLock()
+
+    # ── Maintenance ------------------------------------------------------------
+    def _slot(self, product_id: int) -> int:
+        slot = self._slot_of.get(product_id)
+        if slot is None:
+            slot = self._slot_of[product_id] = self.size
+            if slot == len(self._product_ids):
+                self._grow()
+            self._product_ids[slot] = product_id
+            self.size += 1
+        return slot
+
+    def _grow(self) -> None:
+        def doubled(values, fill):
+            grown = np.full((len(values) * 2,) + values.shape[1:], fill, values.dtype)
+            grown[:len(values)] = values
+            return grown
+        self._product_ids = doubled(self._product_ids, 0)
+        self._stock = doubled(self._stock, 0)
+        self._history = doubled(self._history, 0.0)
+        self._forecast = doubled(self._forecast, 0.0)
+        self._reorder_point = doubled(self._reorder_point, 0.0)
+        self._cover = doubled(self._cover, math.inf)
+
+    def _slots_for(self, line_items, codes: np.ndarray) -> np.ndarray:
+        known = len(self._slot_for_code)
+        if known < len(line_items.product_ids):
+            new = [self._slot(pid) for pid in line_items.product_ids[known:]]
+            self._slot_for_code = np.concatenate([self._slot_for_code, np.array(new, np.int64)])
+        return self._slot_for_code[codes]
+
+    def _add_lines(self, line_items, start: int, end: int) -> np.ndarray:
+        """Add order lines ``start:end`` of the line item store into the history; return their slots."""
+        day = line_items.column("day")[start:end]
+        slots = self._slots_for(line_items, line_items.column("product")[start:end])
+        recent = (day >= self._first_day) & (day < self._first_day + LONG_WINDOW)
+        np.add.at(self._history, (slots[recent], day[recent] - self._first_day),
+                  line_items.column("quantity")[start:end][recent])
+        return slots
+
+    def _sync_stock(self, order_slots: np.ndarray) -> np.ndarray:
+        """Pick up stock changes; return the slots whose stock moved.
+
+        Checkouts only take stock from the products on their order lines, so
+        re-reading those is enough. Anything else (restocks, admin edits,
+        returned stock) moves ``stock_adjustments`` and triggers a diff
+        against the whole catalog.
+        """
+        version = stock_adjustments()
+        if version != self._adjustments:
+            products = load_products()
+            slots = np.fromiter((self._slot(p["id"]) for p in products), np.int64, len(products))
+            stock = np.fromiter((p["stock"] for p in products), np.int64, len(products))
+            self._adjustments = version
+        else:
+            current = read_stocks(self._product_ids[np.unique(order_slots)].tolist())
+            slots = np.fromiter((self._slot_of[pid] for pid in current), np.int64, len(current))
+            stock = np.fromiter(current.values(), np.int64, len(current))
+        changed = stock != self._stock[slots]
+        self._stock[slots[changed]] = stock[changed]
+        return slots[changed]
+
+    def _update(self, slots: np.ndarray) -> None:
+        """Recompute forecast, reorder point and days of cover for ``slots`` and re-queue them."""
+        slots = np.unique(slots)
+        if not len(slots):
+            return
+        history = self._history[slots]
+        forecast = (SHORT_WEIGHT * history[:, -SHORT_WINDOW:].mean(axis=1)
+                    + (1 - SHORT_WEIGHT) * history.mean(axis=1))
+        reorder_point = forecast * self.lead_time + SERVICE_Z * history.std(axis=1) * math.sqrt(self.lead_time)
+        stock = self._stock[slots]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cover = np.where(stock <= 0, 0.0, stock / forecast)
+        self._forecast[slots] = forecast
+        self._reorder_point[slots] = reorder_point
+        self._cover[slots] = cover
+        for product_id, days, below in zip(self._product_ids[slots].tolist(), cover.tolist(),
+                                           (stock <= reorder_point).tolist()):
+            heapq.heappush(self._heap, (days, product_id))
+            if below:
+                self._below.add(product_id)
+            else:
+                self._below.discard(product_id)
+        if len(self._heap) > 2 * self.size + 1024:
+            self._compact()
+
+    def _compact(self) -> None:
+        live = slice(0, self.size)
+        self._heap = list(zip(self._cover[live].tolist(), self._product_ids[live].tolist()))
+        heapq.heapify(self._heap)
+
+    def refresh(self) -> "StockMonitor":
+        """Catch up with new orders and stock changes, touching only the products they affect."""
+        line_items = get_line_items()
+        with self._lock, line_items.lock:
+            first_day = self.today().toordinal() - _EPOCH_ORDINAL - LONG_WINDOW + 1
+            if first_day != self._first_day:
+                # A new day shifts every product's window: rebuild the history in one pass
+                self._first_day = first_day
+                self._history[:] = 0
+                self._add_lines(line_items, 0, line_items.size)
+                self._lines_seen = line_items.size
+                self._adjustments = None
+                self._sync_stock(np.zeros(0, np.int64))
+                self._update(np.arange(self.size))
+                self._compact()
+                return self
+            order_slots = self._add_lines(line_items, self._lines_seen, line_items.size)
+            self._lines_seen = line_items.size
+            self._update(np.concatenate([self._sync_stock(order_slots), order_slots]))
+        return self
+
+    # ── Queries ------------------------------------------------------------------
+    def _row(self, slot: int) -> Dict:
+        return {
+            "id": int(self._product_ids[slot]),
+            "stock": int(self._stock[slot]),
+            "daily_demand": float(self._forecast[slot]),
+            "days_of_cover": float(self._cover[slot]),
+            "reorder_point": math.ceil(self._reorder_point[slot]),
+            "reorder": bool(self._stock[slot] <= self._reorder_point[slot]),
+        }
+
+    def status(self, product_id: int) -> Optional[Dict]:
+        with self._lock:
+            slot = self._slot_of.get(product_id)
+            return None if slot is None else self._row(slot)
+
+    def at_risk(self, k: int = 10) -> List[Dict]:
+        """The ``k`` products with the fewest days of cover left, fewest first."""
+        rows: List[Dict] = []
+        with self._lock:
+            taken: Dict[int, tuple] = {}
+            while self._heap and len(rows) < k:
+                entry = heapq.heappop(self._heap)
+                slot = self._slot_of[entry[1]]
+                if entry[0] != self._cover[slot] or entry[1] in taken:
+                    continue     # superseded by a later push, dropped for good
+                taken[entry[1]] = entry
+                rows.append(self._row(slot))
+            for entry in taken.values():
+                heapq.heappush(self._heap, entry)
+        return rows
+
+    def below_reorder_point(self) -> int:
+        """Number of products whose stock is at or below their reorder point."""
+        with self._lock:
+            return len(self._below)
+
+
+_monitor = StockMonitor()
+
+
+def get_stock_monitor() -> StockMonitor:
+    """Return the process-wide monitor, caught up with the ledger and catalog."""
+    return _monitor.refresh()
@@ -0,0 +1,31 @@
+"""
+test_scraper.py
+The streaming extractor must return what the BeautifulSoup path returns.
+"""
+
+import pytest
+
+from scraper import iter_headlines, parse_headlines
+
+FIXTURE = """<html><body>
+<h3 class="top">Storm warning<script>var x = "<h3>not a headline</h3>";</script></h3>
+<div class="card">
+  <h3>Outer <em>story</em> <h3 class="top">Nested <!-- note -->story</h3> continues</h3>
+  <style>h3 { color: red }</style>
+</div>
+<h3>  </h3>
+<h3>Markets &amp; money</h3>
+</body></html>"""
+
+
+@pytest.mark.parametrize("selectors", [("h3",), ("h3.top",), ("div.card", "h3.top")])
+@pytest.mark.parametrize("chunk", [1, 7, 64 * 1024])
+def test_streaming_matches_beautifulsoup(selectors, chunk):
+    body = FIXTURE.encode()
+    chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+    assert list(iter_headlines(chunks, selectors)) == parse_headlines(FIXTURE, selectors)
+
+
+def test_script_text_and_nested_matches():
+    assert parse_headlines(FIXTURE) == ["Storm warning", "OuterstoryNestedstorycontinues",
+                                        "Nestedstory", "Markets & money"]
@@ -0,0 +1,224 @@
+"""
+text_utils.py
+Clean, deduplicate and persist headlines.
+"""
+
+import hashlib
+import itertools
+import re
+import sqlite3
+import string
+from typing import Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+
+STOP_WORDS = {"live", "video", "podcast", "sport"}   # simple filter example
+BATCH_SIZE = 10_000
+
+
+class HeadlineNormalizer:
+    """Single-pass headline cleaning, compiled once and applied per batch.
+
+    Each batch is joined into one string, so punctuation removal,
+    title-casing and the stop-word scan each run once per batch in C rather
+    than once per headline. All stop words are matched by one precompiled
+    alternation on Unicode word boundaries, so "sport" filters "Sport Live"
+    but not "Transport Strike", and "live" does not match inside "Élive".
+    """
+
+    SEPARATOR = "\x1e"   # ASCII record separator, never part of a headline
+
+    def __init__(self, stop_words: Iterable[str] = STOP_WORDS, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self.table = str.maketrans("", "", string.punctuation)
+        self._punctuation = string.punctuation.encode("ascii")
+        words = sorted({w.lower() for w in stop_words}, key=len, reverse=True)
+        self.stop_words = re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")\b") if words else None
+
+    def clean_line(self, line: str) -> str:
+        """Normalize one headline; returns "" when it should be dropped."""
+        if self.stop_words is not None and self.stop_words.search(line.lower()):
+            return ""
+        return line.translate(self.table).title().strip()
+
+    def clean_batch(self, batch: List[str]) -> List[str]:
+        """Normalize a batch; dropped headlines come back as ""."""
+        block = self.SEPARATOR.join(batch)
+        if block.count(self.SEPARATOR) != len(batch) - 1:
+            return [self.clean_line(line) for line in batch]
+        dropped = set()
+        if self.stop_words is not None:
+            # Lowering can change the length, so hits and separators are both taken from ``lowered``
+            lowered = block.lower()
+            hits = [m.start() for m in self.stop_words.finditer(lowered)]
+            if hits:
+                # A hit belongs to the headline numbered by the separators before it
+                code_points = np.frombuffer(lowered.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+                separators = np.flatnonzero(code_points == ord(self.SEPARATOR))
+                dropped = set(np.searchsorted(separators, hits).tolist())
+        # ASCII punctuation never occurs inside a multi-byte UTF-8 sequence
+        stripped = block.encode("utf-8", "surrogatepass").translate(None, self._punctuation)
+        lines = stripped.decode("utf-8", "surrogatepass").title().split(self.SEPARATOR)
+        for index in dropped:
+            lines[index] = ""
+        return [line.strip() for line in lines]
+
+    def iter_clean(self, raw: Iterable[str], seen: Optional[Set[str]] = None) -> Iterator[str]:
+        """Yield cleaned, deduplicated headlines, consuming ``raw`` batch by batch."""
+        seen = set() if seen is None else seen
+        raw = iter(raw)
+        while True:
+            batch = list(itertools.islice(raw, self.batch_size))
+            if not batch:
+                return
+            for line in self.clean_batch(batch):
+                if line and line not in seen:
+                    seen.add(line)
+                    yield line
+
+
+_default_normalizer = HeadlineNormalizer()
+
+
+def iter_clean_headlines(raw: Iterable[str]) -> Iterator[str]:
+    return _default_normalizer.iter_clean(raw)
+
+
+def clean_headlines(raw: List[str]) -> List[str]:
+    return list(iter_clean_headlines(raw))
+
+
+# ── Cross-run deduplication ---------------------------------------------------
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4      # 4 x 16-bit bands: any pair within 3 bits shares a band
+
+
+def normalize_headline(headline: str) -> str:
+    """Case-, punctuation- and spacing-insensitive form used as the dedup key."""
+    return " ".join(headline.translate(_default_normalizer.table).lower().split())
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of a normalized headline's words and word pairs."""
+    words = text.split()
+    features = words + [" ".join(pair) for pair in zip(words, words[1:])]
+    if not features:
+        return 0
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features)
+    # One row of 64 bits per feature; a bit is set where most features set it
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(features), 8), axis=1)
+    majority = bits.sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class HeadlineIndex:
+    """On-disk record of every headline already kept, surviving restarts.
+
+    Exact duplicates are found through the primary key on the normalized
+    headline's digest. With ``near_duplicates`` enabled, a SimHash of each
+    headline is also stored in 16-bit bands, so reworded repeats within
+    ``max_distance`` bits are caught with a few indexed lookups rather than a
+    scan of the history.
+    """
+
+    def __init__(self, path: str = "headlines.db", near_duplicates: bool = False, max_distance: int = 3):
+        if max_distance >= SIMHASH_BANDS:
+            raise ValueError(f"max_distance must be below {SIMHASH_BANDS} for the banded lookup to be exact")
+        self.near_duplicates = near_duplicates
+        self.max_distance = max_distance
+        try:
+            self.conn = sqlite3.connect(path)
+            self.conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS seen (
+                    key        BLOB PRIMARY KEY,
+                    headline   TEXT NOT NULL,
+                    simhash    INTEGER,
+                    first_seen TEXT NOT NULL DEFAULT (datetime('now'))
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS simhash_bands (
+                    band  INTEGER NOT NULL,
+                    value INTEGER NOT NULL,
+                    key   BLOB    NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_simhash_bands ON simhash_bands (band, value);
+            """)
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Cannot open headline index {path}: {exc}") from exc
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _key(normalized: str) -> bytes:
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+    def _bands(self, fingerprint: int):
+        width = SIMHASH_BITS // SIMHASH_BANDS
+        mask = (1 << width) - 1
+        return [(band, fingerprint >> (band * width) & mask) for band in range(SIMHASH_BANDS)]
+
+    def _near_duplicate(self, fingerprint: int) -> bool:
+        for band, value in self._bands(fingerprint):
+            for (candidate,) in self.conn.execute(
+                "SELECT s.simhash FROM simhash_bands b JOIN seen s ON s.key = b.key "
+                "WHERE b.band = ? AND b.value = ?", (band, value)
+            ):
+                if bin((candidate & ((1 << 64) - 1)) ^ fingerprint).count("1") <= self.max_distance:
+                    return True
+        return False
+
+    def check_new(self, headlines: Iterable[str]) -> List[str]:
+        """Return the headlines not seen in any earlier run, recording them provisionally.
+
+        The records stay in an open transaction, so repeats within the batch
+        are still caught, but nothing is remembered until ``commit`` is
+        called. ``rollback`` forgets them again.
+        """
+        fresh = []
+        try:
+            for headline in headlines:
+                normalized = normalize_headline(headline)
+                if not normalized:
+                    continue
+                key = self._key(normalized)
+                fingerprint = simhash(normalized) if self.near_duplicates else None
+                if fingerprint is not None and self._near_duplicate(fingerprint):
+                    continue
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO seen (key, headline, simhash) VALUES (?, ?, ?)",
+                    (key, headline, None if fingerprint is None else _signed(fingerprint)),
+                )
+                if cur.rowcount == 0:
+                    continue
+                if fingerprint is not None:
+                    self.conn.executemany(
+                        "INSERT INTO simhash_bands (band, value, key) VALUES (?, ?, ?)",
+                        [(band, value, key) for band, value in self._bands(fingerprint)],
+                    )
+                fresh.append(headline)
+        except sqlite3.Error as exc:
+            self.conn.rollback()
+            raise RuntimeError(f"Cannot update headline index: {exc}") from exc
+        return fresh
+
+    def commit(self) -> None:
+        """Remember the headlines returned by ``check_new`` since the last commit."""
+        try:
+            self.conn.commit()
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Cannot update headline index: {exc}") from exc
+
+    def rollback(self) -> None:
+        self.conn.rollback()
@@ -0,0 +1,35 @@
+"""
+utils.py
+Small Streamlit helpers shared by the shop pages.
+"""
+
+from typing import Dict, List
+
+import streamlit as st
+
+FLASH_KEY = "_flash_messages"
+FLASH_LEVELS = {
+    "success": st.success,
+    "info": st.info,
+    "warning": st.warning,
+    "error": st.error,
+}
+
+
+def flash(message: str, level: str = "success", toast: bool = False) -> None:
+    """Queue a message for the next script run, so it survives ``st.rerun()``."""
+    st.session_state.setdefault(FLASH_KEY, []).append((message, level, toast))
+
+
+def show_flash_messages() -> None:
+    """Render and clear every queued message; call once near the top of a run."""
+    for message, level, toast in st.session_state.pop(FLASH_KEY, []):
+        if toast:
+            st.toast(message)
+        else:
+            FLASH_LEVELS.get(level, st.info)(message)
+
+
+def calculate_cart_total(cart: List[Dict]) -> float:
+    """Total of a ``[{"product": ..., "quantity": n}]`` cart, summed in cents."""
+    return sum(int(round(line["product"]["price"] * 100)) * int(line["quantity"]) for line in cart) / 100